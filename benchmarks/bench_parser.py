@@ -0,0 +1,71 @@
+"""Micro-benchmark of the trip response parser.
+
+Run from the repository root with Home Assistant installed:
+
+    python benchmarks/bench_parser.py [--journeys 20] [--legs 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from custom_components.vastraffik_journey.parser import parse_journeys  # noqa: E402
+
+TZ = timezone(timedelta(hours=2))
+
+
+def build_response(journeys: int, legs: int) -> list[dict]:
+    """Return ``results`` shaped like a journeys response."""
+    start = datetime(2024, 5, 6, 7, 0, tzinfo=TZ)
+    results = []
+    for j in range(journeys):
+        departure = start + timedelta(minutes=10 * j)
+        trip_legs = []
+        for l in range(legs):
+            leg_departure = departure + timedelta(minutes=15 * l)
+            leg_arrival = leg_departure + timedelta(minutes=12)
+            trip_legs.append({
+                "origin": {"stopPoint": {"name": f"Stop {l}, Göteborg"}},
+                "destination": {"stopPoint": {"name": f"Stop {l + 1}, Göteborg"}},
+                "serviceJourney": {
+                    "direction": f"Terminus {l}",
+                    "line": {"shortName": str(l + 1), "name": f"Line {l + 1}"},
+                },
+                "plannedDepartureTime": leg_departure.isoformat(),
+                "estimatedDepartureTime": (leg_departure + timedelta(minutes=1)).isoformat(),
+                "plannedArrivalTime": leg_arrival.isoformat(),
+                "estimatedArrivalTime": (leg_arrival + timedelta(minutes=1)).isoformat(),
+                "isCancelled": False,
+            })
+        results.append({"detailsReference": f"ref-{j}", "tripLegs": trip_legs})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--journeys", type=int, default=20)
+    parser.add_argument("--legs", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = build_response(args.journeys, args.legs)
+    timer = timeit.Timer(lambda: parse_journeys(results))
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=args.repeat, number=number)) / number
+    render = timeit.Timer(lambda: parse_journeys(results)[0].connections())
+    render_number, _ = render.autorange()
+    render_best = min(render.repeat(repeat=args.repeat, number=render_number)) / render_number
+
+    print(f"{args.journeys} journeys x {args.legs} legs")
+    print(f"parse:            {best * 1e6:9.1f} us/response  {best * 1e6 / args.journeys:7.2f} us/journey")
+    print(f"parse + connections of the first journey: {render_best * 1e6:9.1f} us/response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""Offline benchmark of update cycles against a local fake Travel Planner.
+
+Starts ``fake_server.FakeTravelPlanner``, points the API client at it and
+drives journey sensors, journey list sensors and the options flow
+autocomplete through a simulated stretch of time. The simulated clock jumps
+from one coordinator refresh to the next, so hours of polling finish in
+seconds of wall time.
+
+Run from the repository root with Home Assistant (2024.1 or later) installed:
+
+    python benchmarks/bench_update_cycle.py --sensors 8 --list-sensors 2 --hours 2
+    python benchmarks/bench_update_cycle.py --latency-ms 300 --error-rate 0.05
+
+Reports API calls per simulated hour, update latency percentiles, executor
+thread occupancy and memory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.vastraffik_journey import (  # noqa: E402
+    api,
+    circuit_breaker,
+    coordinator as coordinator_module,
+    rate_limiter,
+    sensor as sensor_module,
+    trip_cache,
+)
+from custom_components.vastraffik_journey.config_flow import VastraffikJourneyOptionsFlowHandler  # noqa: E402
+from custom_components.vastraffik_journey.rate_limiter import async_get_rate_limiter  # noqa: E402
+from fake_server import FakeTravelPlanner  # noqa: E402
+
+CLIENT_ID = "benchmark"
+SECRET = "benchmark"
+START = datetime(2024, 5, 6, 6, 30, tzinfo=timezone(timedelta(hours=2)))
+STOPS = [
+    "Brunnsparken",
+    "Chalmers",
+    "Korsvägen",
+    "Järntorget",
+    "Centralstationen",
+    "Lindholmen",
+    "Hjalmar Brantingsplatsen",
+    "Kapellplatsen",
+    "Marklandsgatan",
+    "Frölunda torg",
+]
+TYPED_STOPS = ["Brunnsparken", "Chalmers", "Frölunda torg", "Kapellplatsen"]
+
+
+class SimulatedClock:
+    """Replacement for ``homeassistant.util.dt.now`` that only moves when told to.
+
+    ``time`` stands in for the time module of the integration's modules: its
+    monotonic clock runs in real time plus the simulated time that has
+    passed, so cache TTLs, token expiry and circuit backoffs expire across
+    simulated hours while request latencies are still measured for real.
+    """
+
+    def __init__(self, start: datetime):
+        self.start = self.current = start
+        self.time = SimpleNamespace(monotonic=self.monotonic)
+
+    def now(self, time_zone=None) -> datetime:
+        return self.current.astimezone(time_zone) if time_zone else self.current
+
+    def monotonic(self) -> float:
+        return time.monotonic() + (self.current - self.start).total_seconds()
+
+    def advance(self, delta: timedelta) -> None:
+        self.current += delta
+
+
+class ExecutorMonitor:
+    """Measure how long executor jobs of the event loop keep a thread busy."""
+
+    def __init__(self):
+        self.jobs = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def install(self, loop: asyncio.AbstractEventLoop) -> None:
+        original = loop.run_in_executor
+
+        def run_in_executor(executor, func, *args):
+            def timed():
+                start = time.perf_counter()
+                try:
+                    return func(*args)
+                finally:
+                    with self._lock:
+                        self.jobs += 1
+                        self.busy += time.perf_counter() - start
+
+            return original(executor, timed)
+
+        loop.run_in_executor = run_in_executor
+
+
+class _BenchEntry:
+    """The parts of a config entry the options flow reads."""
+
+    data = {"client_id": CLIENT_ID, "secret": SECRET}
+    options: dict = {}
+
+
+class BenchOptionsFlow(VastraffikJourneyOptionsFlowHandler):
+    """Options flow using the benchmark credentials instead of a registered entry."""
+
+    def _get_credentials(self):
+        return CLIENT_ID, SECRET
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return {"p50": value, "p90": value, "p99": value, "max": value}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p90": cuts[89], "p99": cuts[98], "max": max(samples)}
+
+
+def build_sensors(coordinator, count: int, list_count: int):
+    journey_sensors = [
+        sensor_module.VasttrafikJourneySensor(
+            coordinator,
+            None,
+            f"{STOPS[idx % len(STOPS)]}, Göteborg",
+            f"{STOPS[(idx + 1) % len(STOPS)]}, Göteborg",
+            ["6"] if idx % 2 else None,
+            idx % 3 * 5,
+            index=idx,
+        )
+        for idx in range(count)
+    ]
+    list_sensors = [
+        sensor_module.VasttrafikJourneyListSensor(
+            coordinator,
+            None,
+            f"{STOPS[idx % len(STOPS)]}, Göteborg",
+            f"{STOPS[(idx + 1) % len(STOPS)]}, Göteborg",
+            None,
+            "07:00",
+            "09:00",
+            "departure",
+            index=idx,
+        )
+        for idx in range(list_count)
+    ]
+    return journey_sensors, list_sensors
+
+
+async def run_update_cycles(hass, client, args, clock: SimulatedClock) -> list[float]:
+    """Refresh the coordinator until the simulated time is up, returning cycle latencies."""
+    coordinator = coordinator_module.VasttrafikTripCoordinator(
+        hass,
+        client,
+        name="benchmark",
+        min_poll_interval=args.min_poll_interval,
+        max_poll_interval=args.max_poll_interval,
+    )
+    journey_sensors, list_sensors = build_sensors(coordinator, args.sensors, args.list_sensors)
+    coordinator.async_add_locations(
+        {name for sensor in (*journey_sensors, *list_sensors) for name in (sensor._origin, sensor._destination)}
+    )
+    for sensor in (*journey_sensors, *list_sensors):
+        coordinator.async_subscribe(sensor)
+
+    latencies = []
+    end = clock.current + timedelta(hours=args.hours)
+    while clock.current < end:
+        start = time.perf_counter()
+        await coordinator.async_refresh()
+        # What _handle_coordinator_update does, without writing states
+        for sensor in journey_sensors:
+            sensor._process_journeys(coordinator.trip_results(sensor.trip_query))
+        for sensor in list_sensors:
+            sensor._process_journeys(coordinator.window_results(sensor.window_query))
+        latencies.append(time.perf_counter() - start)
+        clock.advance(coordinator.update_interval)
+    return latencies
+
+
+async def run_options_flow(hass) -> list[float]:
+    """Type stop names into the add departure step one character at a time."""
+    flow = BenchOptionsFlow(_BenchEntry())
+    flow.hass = hass
+    flow.flow_id = "benchmark"
+    flow.handler = "benchmark"
+    latencies = []
+    for name in TYPED_STOPS:
+        for end in range(3, len(name) + 1):
+            start = time.perf_counter()
+            await flow.async_step_add_departure({"from_partial": name[:end]})
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def async_main(args) -> str:
+    server = FakeTravelPlanner(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    base_url = await server.start()
+    executor = ExecutorMonitor()
+    executor.install(asyncio.get_running_loop())
+    clock = SimulatedClock(START)
+    tracemalloc.start()
+    wall_start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as config_dir, ExitStack() as stack:
+        stack.enter_context(patch.object(api, "TOKEN_URL", f"{base_url}/token"))
+        stack.enter_context(patch.object(api, "API_BASE_URL", f"{base_url}/pr/v4"))
+        stack.enter_context(patch.object(coordinator_module, "now", clock.now))
+        stack.enter_context(patch.object(sensor_module, "now", clock.now))
+        for module in (api, circuit_breaker, rate_limiter, trip_cache):
+            stack.enter_context(patch.object(module, "time", clock.time))
+        hass = HomeAssistant(config_dir)
+        session = aiohttp.ClientSession()
+        try:
+            tokens = api.VasttrafikTokenManager(hass, session, CLIENT_ID, SECRET)
+            # async_get_client would hand out HA's shared session; keep ours for the fake server
+            hass.data.setdefault(coordinator_module.DOMAIN, {}).setdefault(api.DATA_TOKENS, {})[CLIENT_ID] = tokens
+            limiter = None if args.no_rate_limit else async_get_rate_limiter(hass)
+            client = api.VasttrafikApiClient(session, tokens, limiter)
+            stack.enter_context(patch.object(api, "async_get_clientsession", lambda _hass: session))
+
+            cycle_latencies = await run_update_cycles(hass, client, args, clock)
+            update_calls = dict(server.calls)
+            flow_latencies = await run_options_flow(hass)
+        finally:
+            await session.close()
+            await hass.async_stop(force=True)
+
+    wall = time.perf_counter() - wall_start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    flow_calls = {k: v - update_calls.get(k, 0) for k, v in server.calls.items() if v - update_calls.get(k, 0)}
+
+    lines = [
+        f"Simulated {args.hours} h, {args.sensors} journey sensors, {args.list_sensors} list sensors,"
+        f" latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, error rate {args.error_rate:.0%},"
+        f" 429 rate {args.rate_limit_rate:.0%}",
+        "",
+        "API calls per hour (update cycles):",
+        *(f"  {endpoint:<10} {count / args.hours:8.1f}" for endpoint, count in sorted(update_calls.items())),
+        f"  {'total':<10} {sum(update_calls.values()) / args.hours:8.1f}",
+        "Injected failures: " + (", ".join(f"{k} x{v}" for k, v in sorted(server.errors.items())) or "none"),
+        "",
+        f"Update cycle latency over {len(cycle_latencies)} cycles (ms):",
+        "  " + "  ".join(f"{k} {v * 1000:.1f}" for k, v in percentiles(cycle_latencies).items()),
+        f"Options flow autocomplete over {len(flow_latencies)} keystrokes (ms), calls {flow_calls or 'none'}:",
+        "  " + "  ".join(f"{k} {v * 1000:.1f}" for k, v in percentiles(flow_latencies).items()),
+        "",
+        f"Executor: {executor.jobs} jobs, {executor.busy * 1000:.1f} ms busy,"
+        f" {executor.busy / wall:.2%} of {wall:.1f} s wall time",
+        f"Memory: traced {current / 2**20:.1f} MiB now, {peak / 2**20:.1f} MiB peak,"
+        f" max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB",
+    ]
+    await server.stop()
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sensors", type=int, default=8, help="journey sensors")
+    parser.add_argument("--list-sensors", type=int, default=2, help="journey list sensors")
+    parser.add_argument("--hours", type=float, default=2.0, help="simulated time")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with HTTP 429")
+    parser.add_argument("--min-poll-interval", type=int, default=coordinator_module.DEFAULT_MIN_POLL_INTERVAL)
+    parser.add_argument("--max-poll-interval", type=int, default=coordinator_module.DEFAULT_MAX_POLL_INTERVAL)
+    parser.add_argument("--no-rate-limit", action="store_true", help="bypass the shared token bucket")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(async_main(args))
+    print(report)
+    if args.output:
+        args.output.write_text(report + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
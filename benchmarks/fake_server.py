@@ -0,0 +1,163 @@
+"""Local stand-in for the Västtrafik token, journeys and locations endpoints.
+
+Recorded responses from ``fixtures/`` are replayed with every timestamp
+shifted to the requested ``dateTime``, so the same fixture answers any time
+of day. Latency and error rates are configurable, and every request is
+counted per endpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import copy
+from datetime import datetime, timedelta
+import json
+from pathlib import Path
+import random
+import unicodedata
+
+from aiohttp import web
+
+FIXTURES = Path(__file__).parent / "fixtures"
+# Shifted details references look like "D003@420": fixture reference @ minutes shifted
+REFERENCE_SEPARATOR = "@"
+
+
+def _fold(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _shift_times(value, shift: timedelta):
+    """Shift every '...Time' field of a response by ``shift``, in place."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key.endswith("Time") and isinstance(item, str):
+                value[key] = (datetime.fromisoformat(item) + shift).isoformat()
+            else:
+                _shift_times(item, shift)
+    elif isinstance(value, list):
+        for item in value:
+            _shift_times(item, shift)
+
+
+class FakeTravelPlanner:
+    """aiohttp application answering like the Travel Planner v4 API."""
+
+    def __init__(
+        self,
+        latency_ms: float = 80.0,
+        jitter_ms: float = 20.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int | None = None,
+        fixtures: Path = FIXTURES,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.calls: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self._random = random.Random(seed)
+        self._journeys = json.loads((fixtures / "journeys.json").read_text(encoding="utf-8"))
+        self._locations = json.loads((fixtures / "locations.json").read_text(encoding="utf-8"))
+        self._token = json.loads((fixtures / "token.json").read_text(encoding="utf-8"))
+        first_leg = self._journeys["results"][0]["tripLegs"][0]
+        self._fixture_start = datetime.fromisoformat(first_leg["plannedDepartureTime"])
+        self._runner: web.AppRunner | None = None
+        self.base_url: str | None = None
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/token", self._handle_token)
+        app.router.add_get("/pr/v4/journeys", self._handle_journeys)
+        app.router.add_get("/pr/v4/journeys/{reference}/details", self._handle_details)
+        app.router.add_get("/pr/v4/locations/by-text", self._handle_locations)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self._app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _simulate(self, endpoint: str) -> web.Response | None:
+        """Count the call, wait out the latency and maybe fail it."""
+        self.calls[endpoint] += 1
+        delay = max(0.0, self._random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            self.errors[f"{endpoint} 429"] += 1
+            return web.json_response({"error": "rate limited"}, status=429, headers={"Retry-After": "1"})
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.errors[f"{endpoint} 500"] += 1
+            return web.json_response({"error": "internal"}, status=500)
+        return None
+
+    async def _handle_token(self, request: web.Request) -> web.Response:
+        return await self._simulate("token") or web.json_response(self._token)
+
+    async def _handle_journeys(self, request: web.Request) -> web.Response:
+        if (failure := await self._simulate("journeys")) is not None:
+            return failure
+        when = request.query.get("dateTime")
+        requested = datetime.fromisoformat(when) if when else datetime.now(self._fixture_start.tzinfo)
+        minutes = int((requested - self._fixture_start).total_seconds() // 60)
+        payload = copy.deepcopy(self._journeys)
+        _shift_times(payload, timedelta(minutes=minutes))
+        for journey in payload["results"]:
+            journey["detailsReference"] = f"{journey['detailsReference']}{REFERENCE_SEPARATOR}{minutes}"
+        return web.json_response(payload)
+
+    async def _handle_details(self, request: web.Request) -> web.Response:
+        if (failure := await self._simulate("details")) is not None:
+            return failure
+        reference, _, minutes = request.match_info["reference"].partition(REFERENCE_SEPARATOR)
+        journey = next((j for j in self._journeys["results"] if j["detailsReference"] == reference), None)
+        if journey is None or not minutes.lstrip("-").isdigit():
+            return web.json_response({"error": "unknown journey"}, status=404)
+        journey = copy.deepcopy(journey)
+        _shift_times(journey, timedelta(minutes=int(minutes)))
+        legs = []
+        for leg in journey["tripLegs"]:
+            legs.append({
+                "callsOnTripLeg": [
+                    {
+                        "stopPoint": leg["origin"]["stopPoint"],
+                        "plannedDepartureTime": leg["plannedDepartureTime"],
+                        "estimatedDepartureTime": leg.get("estimatedDepartureTime", leg["plannedDepartureTime"]),
+                        "isCancelled": False,
+                    },
+                    {
+                        "stopPoint": leg["destination"]["stopPoint"],
+                        "plannedArrivalTime": leg["plannedArrivalTime"],
+                        "estimatedArrivalTime": leg.get("estimatedArrivalTime", leg["plannedArrivalTime"]),
+                        "isCancelled": False,
+                    },
+                ],
+            })
+        return web.json_response({"tripLegs": legs})
+
+    async def _handle_locations(self, request: web.Request) -> web.Response:
+        if (failure := await self._simulate("locations")) is not None:
+            return failure
+        query = _fold(request.query.get("q", "")).strip()
+        limit = int(request.query.get("limit", 10))
+        results = [
+            location for location in self._locations["results"]
+            if any(word.startswith(query) for word in _fold(location["name"]).replace(",", " ").split())
+            or _fold(location["name"]).startswith(query)
+        ]
+        return web.json_response({"results": results[:limit]})
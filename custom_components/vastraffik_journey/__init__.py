@@ -4,10 +4,27 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.typing import ConfigType
 from typing import Any
-from homeassistant.helpers.entity import Entity
 import logging
 import traceback
 
+from .api import async_get_client
+from .const import DOMAIN
+from .entity_index import async_get_entity_index
+from .coordinator import (
+    DEFAULT_LIST_CONCURRENCY,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    VasttrafikTripCoordinator,
+)
+from .sensor import (
+    CONF_GTFS_PATH,
+    CONF_LIST_CONCURRENCY,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_TRIP_CACHE_BUCKET,
+)
+from .trip_cache import DEFAULT_BUCKET
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     try:
@@ -22,19 +39,14 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
             paused = call.data.get("paused")
             toggle = call.data.get("toggle", False)
             # Find the entity and call set_paused or toggle_paused
-            entity: Entity = None
-            for ent in hass.states.async_entity_ids("sensor"):
-                ent_obj = hass.data.get("entity_components", {}).get("sensor", None)
-                if ent_obj:
-                    entity = ent_obj.get_entity(ent)
-                    if entity and entity.entity_id == entity_id:
-                        break
-            if entity:
-                if toggle:
-                    entity.toggle_paused()
-                elif paused is not None:
-                    entity.set_paused(paused)
-                entity.async_write_ha_state()
+            entity = async_get_entity_index(hass).get_by_entity_id(entity_id)
+            if entity is None or not hasattr(entity, "set_paused"):
+                logging.getLogger(__name__).warning("No pausable journey sensor %s", entity_id)
+                return
+            if toggle:
+                entity.toggle_paused()
+            elif paused is not None:
+                entity.set_paused(paused)
         hass.services.async_register(
             "vastraffik_journey",
             "set_pause",
@@ -56,6 +68,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 "Vastraffik Journey config entry missing client_id or secret. Sensor setup aborted."
             )
             return False
+        # One coordinator per entry so identical trip queries are only made once
+        client = async_get_client(hass, entry.data["client_id"], entry.data["secret"])
+        coordinator = VasttrafikTripCoordinator(
+            hass,
+            client,
+            name=f"{DOMAIN}_{entry.entry_id}",
+            list_concurrency=entry.options.get(CONF_LIST_CONCURRENCY, DEFAULT_LIST_CONCURRENCY),
+            trip_cache_bucket=entry.options.get(CONF_TRIP_CACHE_BUCKET, DEFAULT_BUCKET),
+            min_poll_interval=entry.options.get(CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL),
+            max_poll_interval=entry.options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL),
+            gtfs_path=entry.options.get(CONF_GTFS_PATH),
+        )
+        hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
         # Add update listener to reload on options change
         entry.async_on_unload(entry.add_update_listener(async_reload_entry))
         await hass.config_entries.async_forward_entry_setups(entry, ["sensor", "switch"])
@@ -75,6 +100,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     try:
         unload_ok = await hass.config_entries.async_forward_entry_unload(entry, "sensor")
         unload_ok_switch = await hass.config_entries.async_forward_entry_unload(entry, "switch")
+        if unload_ok and unload_ok_switch:
+            hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
         return unload_ok and unload_ok_switch
     except Exception as ex:
         logging.getLogger(__name__).error("Exception in async_unload_entry: %s\n%s", ex, traceback.format_exc())
@@ -0,0 +1,365 @@
+"""Async client for the Västtrafik Travel Planner v4 API."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import logging
+import time
+from typing import Any
+from urllib.parse import parse_qs, quote, urlsplit
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util.json import json_loads
+
+from .const import DOMAIN
+from .circuit_breaker import CircuitBreakers, async_get_circuit_breakers
+from .metrics import ApiMetrics, endpoint_name
+from .rate_limiter import PRIORITY_LOOKUP, PRIORITY_REALTIME, RateLimiter, async_get_rate_limiter
+
+_LOGGER = logging.getLogger(__name__)
+
+TOKEN_URL = "https://ext-api.vasttrafik.se/token"
+API_BASE_URL = "https://ext-api.vasttrafik.se/pr/v4"
+
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=20)
+# Never use a token closer than this many seconds to its expiry
+TOKEN_EXPIRY_MARGIN = 60
+# Start a background renewal once a token is this close to expiring
+TOKEN_REFRESH_AHEAD = 300
+
+DATA_TOKENS = "tokens"
+# How often a request answered with HTTP 429 is queued again before giving up
+MAX_RATE_LIMIT_RETRIES = 2
+DEFAULT_RETRY_AFTER = 5
+
+
+class VasttrafikApiError(Exception):
+    """Raised when the Travel Planner API returns an error."""
+
+
+class VasttrafikAuthError(VasttrafikApiError):
+    """Raised when the client credentials are rejected."""
+
+
+class VasttrafikClientError(VasttrafikApiError):
+    """Raised when the API rejects a request itself (HTTP 4xx), which says nothing about an outage."""
+
+
+class VasttrafikCircuitOpenError(VasttrafikApiError):
+    """Raised without a request while an endpoint's circuit breaker is open."""
+
+    def __init__(self, message: str, retry_in: float):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+
+class VasttrafikRateLimitError(VasttrafikApiError):
+    """Raised when the API answers with HTTP 429."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@callback
+def async_get_client(hass: HomeAssistant, client_id: str, secret: str) -> VasttrafikApiClient:
+    """Return an API client using the token manager shared by this client_id."""
+    session = async_get_clientsession(hass)
+    tokens = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_TOKENS, {})
+    manager = tokens.get(client_id)
+    if manager is None or manager.secret != secret:
+        manager = tokens[client_id] = VasttrafikTokenManager(hass, session, client_id, secret)
+    return VasttrafikApiClient(session, manager, async_get_rate_limiter(hass), async_get_circuit_breakers(hass))
+
+
+async def async_validate_credentials(hass: HomeAssistant, client_id: str, secret: str) -> None:
+    """Check credentials with a token manager of their own; raises VasttrafikApiError if rejected.
+
+    The manager is only shared once the credentials work, so a mistyped
+    secret never replaces the one running entries use for this client_id.
+    """
+    session = async_get_clientsession(hass)
+    manager = VasttrafikTokenManager(hass, session, client_id, secret)
+    client = VasttrafikApiClient(session, manager, async_get_rate_limiter(hass), async_get_circuit_breakers(hass))
+    await client.async_location_name("Göteborg")
+    hass.data.setdefault(DOMAIN, {}).setdefault(DATA_TOKENS, {}).setdefault(client_id, manager)
+
+
+class VasttrafikTokenManager:
+    """OAuth token shared by every client using the same credentials.
+
+    Tokens are renewed in the background shortly before they expire, and
+    concurrent renewals are collapsed into a single token request.
+    """
+
+    def __init__(self, hass: HomeAssistant, session: aiohttp.ClientSession, client_id: str, secret: str):
+        self.hass = hass
+        self.secret = secret
+        self._session = session
+        self._client_id = client_id
+        self._token: str | None = None
+        self._token_expires = 0.0
+        self._renewal: asyncio.Task | None = None
+        self.renewals = 0
+
+    async def async_get_token(self) -> str:
+        """Return a valid token, renewing it first if needed."""
+        remaining = self._token_expires - time.monotonic()
+        if self._token is None or remaining <= TOKEN_EXPIRY_MARGIN:
+            return await self.async_renew()
+        if remaining <= TOKEN_REFRESH_AHEAD:
+            self._async_start_renewal()
+        return self._token
+
+    async def async_renew(self, stale_token: str | None = None) -> str:
+        """Renew the token, unless it already changed since ``stale_token`` was handed out."""
+        if stale_token is not None and self._token not in (None, stale_token):
+            return self._token
+        return await asyncio.shield(self._async_start_renewal())
+
+    @callback
+    def _async_start_renewal(self) -> asyncio.Task:
+        if self._renewal is None:
+            self._renewal = self.hass.async_create_background_task(
+                self._async_fetch_token(), f"{DOMAIN} token renewal"
+            )
+            self._renewal.add_done_callback(self._async_renewal_done)
+        return self._renewal
+
+    @callback
+    def _async_renewal_done(self, task: asyncio.Task) -> None:
+        self._renewal = None
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.debug("Token renewal failed: %s", task.exception())
+
+    async def _async_fetch_token(self) -> str:
+        """Fetch a new OAuth access token using the client credentials flow."""
+        try:
+            async with self._session.post(
+                TOKEN_URL,
+                data={"grant_type": "client_credentials"},
+                auth=aiohttp.BasicAuth(self._client_id, self.secret),
+                timeout=REQUEST_TIMEOUT,
+            ) as resp:
+                if resp.status in (400, 401, 403):
+                    raise VasttrafikAuthError(f"Token request rejected with HTTP {resp.status}")
+                resp.raise_for_status()
+                payload = await resp.json(loads=json_loads, content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            raise VasttrafikApiError(f"Token request failed: {ex}") from ex
+        self._token = payload["access_token"]
+        self._token_expires = time.monotonic() + int(payload.get("expires_in", 0))
+        self.renewals += 1
+        return self._token
+
+
+class VasttrafikApiClient:
+    """Minimal asyncio client covering trip and location endpoints.
+
+    All requests go through the aiohttp session handed in, normally Home
+    Assistant's shared session, so connections are kept alive and pooled with
+    the rest of the instance instead of occupying executor threads.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        tokens: VasttrafikTokenManager,
+        limiter: RateLimiter | None = None,
+        breakers: CircuitBreakers | None = None,
+    ):
+        self._session = session
+        self._tokens = tokens
+        self._limiter = limiter
+        self.breakers = breakers if breakers is not None else CircuitBreakers()
+        self.metrics = ApiMetrics()
+
+    @property
+    def token_renewals(self) -> int:
+        """Return how many tokens were fetched for these credentials, across all clients."""
+        return self._tokens.renewals
+
+    async def _async_get(self, path: str, params: dict[str, Any], priority: int) -> Any:
+        """Send a request unless the endpoint's circuit is open, and record the outcome."""
+        endpoint = endpoint_name(path)
+        breaker = self.breakers.get(endpoint)
+        if not breaker.allow():
+            retry_in = breaker.retry_in()
+            raise VasttrafikCircuitOpenError(
+                f"Requests to {endpoint} are paused for {retry_in:.0f} s after repeated failures", retry_in
+            )
+        try:
+            result = await self._async_get_with_retries(path, params, priority)
+        except VasttrafikClientError:
+            # The endpoint answered, only this request was wrong
+            breaker.record_success()
+            raise
+        except VasttrafikAuthError:
+            breaker.release()
+            raise
+        except VasttrafikApiError:
+            if breaker.record_failure():
+                _LOGGER.warning("Pausing requests to %s for %.0f s after repeated failures", endpoint, breaker.retry_in())
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_success()
+        return result
+
+    async def _async_get_with_retries(self, path: str, params: dict[str, Any], priority: int) -> Any:
+        token = await self._tokens.async_get_token()
+        renewed = False
+        rate_limited = 0
+        while True:
+            if self._limiter is not None:
+                await self._limiter.acquire(priority)
+            try:
+                return await self._async_timed_request(path, params, token)
+            except VasttrafikAuthError:
+                if renewed:
+                    raise
+                # The token was revoked or expired early: renew once and retry
+                _LOGGER.debug("Request to %s was not authorized, renewing token", path)
+                renewed = True
+                token = await self._tokens.async_renew(stale_token=token)
+            except VasttrafikRateLimitError as ex:
+                rate_limited += 1
+                if self._limiter is None or rate_limited > MAX_RATE_LIMIT_RETRIES:
+                    raise
+                # Hold back every caller and queue this request again
+                _LOGGER.debug("Rate limited on %s, pausing requests for %s s", path, ex.retry_after)
+                self._limiter.penalize(ex.retry_after)
+
+    async def _async_timed_request(self, path: str, params: dict[str, Any], token: str) -> Any:
+        """Send one request and record its outcome in ``metrics``."""
+        started = time.monotonic()
+        try:
+            result = await self._async_request(path, params, token)
+        except VasttrafikRateLimitError:
+            self.metrics.record_error(path, rate_limited=True)
+            raise
+        except VasttrafikApiError:
+            self.metrics.record_error(path)
+            raise
+        self.metrics.record_success(path, (time.monotonic() - started) * 1000)
+        return result
+
+    async def _async_request(self, path: str, params: dict[str, Any], token: str) -> Any:
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+        }
+        try:
+            async with self._session.get(
+                f"{API_BASE_URL}/{path}",
+                params={k: v for k, v in params.items() if v is not None},
+                headers=headers,
+                timeout=REQUEST_TIMEOUT,
+            ) as resp:
+                if resp.status == 401:
+                    raise VasttrafikAuthError(f"Request to {path} was not authorized")
+                if resp.status == 429:
+                    try:
+                        retry_after = float(resp.headers.get("Retry-After", DEFAULT_RETRY_AFTER))
+                    except ValueError:
+                        retry_after = DEFAULT_RETRY_AFTER
+                    raise VasttrafikRateLimitError(f"Request to {path} was rate limited", retry_after)
+                if 400 <= resp.status < 500:
+                    raise VasttrafikClientError(f"Request to {path} failed with HTTP {resp.status}")
+                if resp.status >= 400:
+                    raise VasttrafikApiError(f"Request to {path} failed with HTTP {resp.status}")
+                return await resp.json(loads=json_loads, content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            raise VasttrafikApiError(f"Request to {path} failed: {ex}") from ex
+
+    async def async_location_name(self, name: str, limit: int = 10, priority: int = PRIORITY_LOOKUP) -> list[dict]:
+        """Search stop areas by (partial) name."""
+        payload = await self._async_get(
+            "locations/by-text",
+            {"q": name, "types": "stoparea", "limit": limit},
+            priority,
+        )
+        return payload.get("results", [])
+
+    async def async_trip(
+        self,
+        origin_id: str,
+        dest_id: str,
+        date: datetime | None = None,
+        date_time_relates_to: str | None = None,
+        limit: int | None = None,
+        priority: int = PRIORITY_REALTIME,
+    ) -> list[dict]:
+        """Search journeys between two stop areas."""
+        results, _ = await self.async_trip_page(
+            origin_id, dest_id, date, date_time_relates_to, limit, priority=priority
+        )
+        return results
+
+    async def async_trip_page(
+        self,
+        origin_id: str,
+        dest_id: str,
+        date: datetime | None = None,
+        date_time_relates_to: str | None = None,
+        limit: int | None = None,
+        pagination_reference: str | None = None,
+        priority: int = PRIORITY_REALTIME,
+    ) -> tuple[list[dict], str | None]:
+        """Search journeys and return them with the cursor of the next page, if any."""
+        payload = await self._async_get(
+            "journeys",
+            {
+                "originGid": origin_id,
+                "destinationGid": dest_id,
+                "dateTime": date.isoformat() if date and not pagination_reference else None,
+                "dateTimeRelatesTo": date_time_relates_to,
+                "limit": limit,
+                "paginationReference": pagination_reference,
+            },
+            priority,
+        )
+        return payload.get("results", []), _next_pagination_reference(payload)
+
+    async def async_journey_details(self, details_reference: str, priority: int = PRIORITY_REALTIME) -> dict:
+        """Return the realtime details of one journey found by a search."""
+        return await self._async_get(
+            f"journeys/{quote(details_reference, safe='')}/details",
+            {"includes": "servicejourneycalls"},
+            priority,
+        )
+
+    async def async_departures(
+        self,
+        stop_area_gid: str,
+        date: datetime | None = None,
+        time_span: int | None = None,
+        limit: int | None = None,
+        priority: int = PRIORITY_REALTIME,
+    ) -> list[dict]:
+        """Return the departure board of a stop area, every line and direction in one call."""
+        payload = await self._async_get(
+            f"stop-areas/{quote(stop_area_gid, safe='')}/departures",
+            {
+                "startDateTime": date.isoformat() if date else None,
+                "timeSpanInMinutes": time_span,
+                "limit": limit,
+            },
+            priority,
+        )
+        return payload.get("results", [])
+
+
+def _next_pagination_reference(payload: dict) -> str | None:
+    """Extract the paginationReference of the 'next' link of a response."""
+    next_link = (payload.get("links") or {}).get("next")
+    if not next_link:
+        return None
+    values = parse_qs(urlsplit(next_link).query).get("paginationReference")
+    return values[0] if values else None
@@ -0,0 +1,122 @@
+"""Per-endpoint circuit breakers with jittered exponential backoff, shared by all entries."""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .util import domain_singleton
+
+DATA_CIRCUIT_BREAKERS = "circuit_breakers"
+
+# Consecutive failed requests that open a circuit
+FAILURE_THRESHOLD = 3
+# Seconds an endpoint is left alone after opening; doubles with every failed trial
+BASE_BACKOFF = 30.0
+MAX_BACKOFF = 900.0
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+@callback
+def async_get_circuit_breakers(hass: HomeAssistant) -> CircuitBreakers:
+    """Return the circuit breakers of all endpoints."""
+    return domain_singleton(hass, DATA_CIRCUIT_BREAKERS, CircuitBreakers)
+
+
+class CircuitBreaker:
+    """Stop calling an endpoint while it keeps failing.
+
+    After FAILURE_THRESHOLD consecutive failures the circuit opens. Each
+    backoff is drawn from the upper half of an exponentially growing
+    interval, so clients that failed together do not all retry at the same
+    moment. Once the backoff has passed, a single trial request is let
+    through: success closes the circuit, failure opens it again for longer.
+    """
+
+    def __init__(self, threshold: int = FAILURE_THRESHOLD, base: float = BASE_BACKOFF, maximum: float = MAX_BACKOFF):
+        self.threshold = threshold
+        self.base = base
+        self.maximum = maximum
+        self.failures = 0
+        self.opened = 0  # times opened since the circuit last closed
+        self._open_until: float | None = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self._open_until is None:
+            return STATE_CLOSED
+        if self._trial or time.monotonic() >= self._open_until:
+            return STATE_HALF_OPEN
+        return STATE_OPEN
+
+    def retry_in(self) -> float:
+        """Return the seconds until a request will be let through again."""
+        if self._open_until is None:
+            return 0.0
+        return max(0.0, self._open_until - time.monotonic())
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent now; claims the trial of a half-open circuit."""
+        if self._open_until is None:
+            return True
+        if self._trial or time.monotonic() < self._open_until:
+            return False
+        self._trial = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened = 0
+        self._open_until = None
+        self._trial = False
+
+    def record_failure(self) -> bool:
+        """Count a failed request; return True if that opened the circuit."""
+        self.failures += 1
+        if not self._trial and (self._open_until is not None or self.failures < self.threshold):
+            # Below the threshold, or a request sent before the circuit opened
+            return False
+        self._trial = False
+        backoff = min(self.maximum, self.base * 2**self.opened)
+        self.opened += 1
+        self._open_until = time.monotonic() + backoff * random.uniform(0.5, 1.0)
+        return True
+
+    def release(self) -> None:
+        """Give up a claimed trial without an outcome, e.g. when the request was cancelled."""
+        self._trial = False
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in": round(self.retry_in(), 1),
+        }
+
+
+class CircuitBreakers:
+    """One circuit breaker per endpoint, created on first use."""
+
+    def __init__(self):
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker()
+        return breaker
+
+    def retry_in(self, endpoint: str) -> float:
+        """Return the seconds until an endpoint takes requests again, 0 if it does now."""
+        breaker = self._breakers.get(endpoint)
+        return breaker.retry_in() if breaker is not None else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {endpoint: breaker.as_dict() for endpoint, breaker in self._breakers.items()}
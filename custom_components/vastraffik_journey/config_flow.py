@@ -2,12 +2,16 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.const import CONF_NAME
-from .sensor import CONF_CLIENT_ID, CONF_SECRET, CONF_DEPARTURES, CONF_FROM, CONF_DESTINATION, CONF_DELAY, CONF_HEADING, CONF_LINES, DEFAULT_DELAY, CONF_LIST_START_TIME, CONF_LIST_END_TIME, CONF_LIST_TIME_RELATES_TO
-from vasttrafik import JournyPlanner
+from .sensor import CONF_CLIENT_ID, CONF_SECRET, CONF_DEPARTURES, CONF_FROM, CONF_DESTINATION, CONF_DELAY, CONF_HEADING, CONF_LINES, DEFAULT_DELAY, CONF_LIST_START_TIME, CONF_LIST_END_TIME, CONF_LIST_TIME_RELATES_TO, CONF_LIST_CONCURRENCY, CONF_TRIP_CACHE_BUCKET, CONF_MIN_POLL_INTERVAL, CONF_MAX_POLL_INTERVAL, CONF_DIAGNOSTIC_SENSORS, CONF_GTFS_PATH, CONF_DEPARTURE_BOARDS, CONF_DESTINATIONS
+from .coordinator import DEFAULT_LIST_CONCURRENCY, DEFAULT_MIN_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL
+from .trip_cache import DEFAULT_BUCKET
+from .api import async_get_client, async_validate_credentials
+from .const import DOMAIN
+from .stop_cache import async_get_stop_cache
 import logging
+import os
 
 _LOGGER = logging.getLogger(__name__)
-DOMAIN = "vastraffik_journey"
 
 class VastraffikJourneyConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Vastraffik Journey."""
@@ -40,12 +44,9 @@ class VastraffikJourneyConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
     async def _async_validate_credentials(self, client_id, secret):
-        def validate():
-            planner = JournyPlanner(client_id, secret)
-            planner.location_name("Göteborg")
-            return True
         try:
-            return await self.hass.async_add_executor_job(validate)
+            await async_validate_credentials(self.hass, client_id, secret)
+            return True
         except Exception as ex:
             _LOGGER.warning("Västtrafik credential validation failed: %s", ex)
             return False
@@ -59,10 +60,20 @@ class VastraffikJourneyOptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry):
         self.departures = list(config_entry.options.get(CONF_DEPARTURES, []))
         self.journey_list_sensors = list(config_entry.options.get("journey_list_sensors", []))
+        self.departure_boards = list(config_entry.options.get(CONF_DEPARTURE_BOARDS, []))
+        self.settings = {
+            CONF_LIST_CONCURRENCY: config_entry.options.get(CONF_LIST_CONCURRENCY, DEFAULT_LIST_CONCURRENCY),
+            CONF_TRIP_CACHE_BUCKET: config_entry.options.get(CONF_TRIP_CACHE_BUCKET, DEFAULT_BUCKET),
+            CONF_MIN_POLL_INTERVAL: config_entry.options.get(CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL),
+            CONF_MAX_POLL_INTERVAL: config_entry.options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL),
+            CONF_DIAGNOSTIC_SENSORS: config_entry.options.get(CONF_DIAGNOSTIC_SENSORS, False),
+            CONF_GTFS_PATH: config_entry.options.get(CONF_GTFS_PATH, ""),
+        }
         self._current_departure = None
         self._edit_index = None
         self._current_list_sensor = None
         self._edit_list_index = None
+        self._current_board = None
 
     def _get_credentials(self):
         # Prefer options, fallback to data
@@ -72,6 +83,12 @@ class VastraffikJourneyOptionsFlowHandler(config_entries.OptionsFlow):
             raise ValueError("Missing Västtrafik credentials in config entry.")
         return client_id, secret
 
+    async def _async_get_suggestions(self, partial):
+        client_id, secret = self._get_credentials()
+        client = async_get_client(self.hass, client_id, secret)
+        stop_cache = await async_get_stop_cache(self.hass)
+        return await stop_cache.async_search(client, partial)
+
     async def async_step_init(self, user_input=None):
         return await self.async_step_menu()
 
@@ -84,6 +101,9 @@ class VastraffikJourneyOptionsFlowHandler(config_entries.OptionsFlow):
             ("add_list", "Add journey list sensor"),
             ("edit_list", "Edit journey list sensor"),
             ("remove_list", "Remove journey list sensor"),
+            ("add_board", "Add departure board"),
+            ("remove_board", "Remove departure board"),
+            ("settings", "Settings"),
             ("finish", "Finish"),
         ]
         menu_schema = vol.Schema({
@@ -115,29 +135,61 @@ class VastraffikJourneyOptionsFlowHandler(config_entries.OptionsFlow):
                     errors["base"] = "no_list_sensors"
                 else:
                     return await self.async_step_select_remove_list()
+            elif action == "add_board":
+                return await self.async_step_add_board()
+            elif action == "remove_board":
+                if not self.departure_boards:
+                    errors["base"] = "no_departure_boards"
+                else:
+                    return await self.async_step_select_remove_board()
+            elif action == "settings":
+                return await self.async_step_settings()
             elif action == "finish":
-                return self.async_create_entry(title="", data={CONF_DEPARTURES: self.departures, "journey_list_sensors": self.journey_list_sensors})
+                return self.async_create_entry(title="", data={CONF_DEPARTURES: self.departures, "journey_list_sensors": self.journey_list_sensors, CONF_DEPARTURE_BOARDS: self.departure_boards, **self.settings})
         return self.async_show_form(
             step_id="menu",
             data_schema=menu_schema,
             errors=errors,
             description_placeholders={
                 "departures": str(self.departures),
-                "list_sensors": str(self.journey_list_sensors)
+                "list_sensors": str(self.journey_list_sensors),
+                "departure_boards": str(self.departure_boards),
             }
         )
 
+    async def async_step_settings(self, user_input=None):
+        errors = {}
+        schema = vol.Schema({
+            vol.Optional(CONF_LIST_CONCURRENCY, default=self.settings[CONF_LIST_CONCURRENCY]): vol.All(int, vol.Range(min=1, max=16)),
+            vol.Optional(CONF_TRIP_CACHE_BUCKET, default=self.settings[CONF_TRIP_CACHE_BUCKET]): vol.All(int, vol.Range(min=1, max=900)),
+            vol.Optional(CONF_MIN_POLL_INTERVAL, default=self.settings[CONF_MIN_POLL_INTERVAL]): vol.All(int, vol.Range(min=10, max=3600)),
+            vol.Optional(CONF_MAX_POLL_INTERVAL, default=self.settings[CONF_MAX_POLL_INTERVAL]): vol.All(int, vol.Range(min=10, max=7200)),
+            vol.Optional(CONF_DIAGNOSTIC_SENSORS, default=self.settings[CONF_DIAGNOSTIC_SENSORS]): bool,
+            vol.Optional(CONF_GTFS_PATH, default=self.settings[CONF_GTFS_PATH]): str,
+        })
+        if user_input is not None:
+            gtfs_path = user_input.get(CONF_GTFS_PATH, "").strip()
+            user_input[CONF_GTFS_PATH] = gtfs_path
+            if user_input[CONF_MIN_POLL_INTERVAL] > user_input[CONF_MAX_POLL_INTERVAL]:
+                errors[CONF_MAX_POLL_INTERVAL] = "invalid_poll_interval"
+            elif gtfs_path and not await self.hass.async_add_executor_job(os.path.isfile, self.hass.config.path(gtfs_path)):
+                errors[CONF_GTFS_PATH] = "invalid_gtfs_path"
+            else:
+                self.settings.update(user_input)
+                return await self.async_step_menu()
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=schema,
+            errors=errors,
+        )
+
     async def async_step_add_departure(self, user_input=None):
         errors = {}
         if user_input is not None and "from_partial" in user_input:
             # Step 1: User entered a partial 'from' name, fetch suggestions
             partial = user_input["from_partial"]
-            def get_suggestions():
-                client_id, secret = self._get_credentials()
-                planner = JournyPlanner(client_id, secret)
-                return planner.location_name(partial)
             try:
-                suggestions = await self.hass.async_add_executor_job(get_suggestions)
+                suggestions = await self._async_get_suggestions(partial)
             except Exception as ex:
                 _LOGGER.error("Failed to fetch location suggestions: %s", ex)
                 errors["base"] = "location_error"
@@ -175,12 +227,8 @@ class VastraffikJourneyOptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None and "destination_partial" in user_input:
             # Step 1: User entered a partial 'destination' name, fetch suggestions
             partial = user_input["destination_partial"]
-            def get_suggestions():
-                client_id, secret = self._get_credentials()
-                planner = JournyPlanner(client_id, secret)
-                return planner.location_name(partial)
             try:
-                suggestions = await self.hass.async_add_executor_job(get_suggestions)
+                suggestions = await self._async_get_suggestions(partial)
             except Exception as ex:
                 _LOGGER.error("Failed to fetch location suggestions: %s", ex)
                 errors["base"] = "location_error"
@@ -326,12 +374,8 @@ class VastraffikJourneyOptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None and "from_partial" in user_input:
             # Step 1: User entered a partial 'from' name, fetch suggestions
             partial = user_input["from_partial"]
-            def get_suggestions():
-                client_id, secret = self._get_credentials()
-                planner = JournyPlanner(client_id, secret)
-                return planner.location_name(partial)
             try:
-                suggestions = await self.hass.async_add_executor_job(get_suggestions)
+                suggestions = await self._async_get_suggestions(partial)
             except Exception as ex:
                 _LOGGER.error("Failed to fetch location suggestions: %s", ex)
                 errors["base"] = "location_error"
@@ -366,12 +410,8 @@ class VastraffikJourneyOptionsFlowHandler(config_entries.OptionsFlow):
         errors = {}
         if user_input is not None and "destination_partial" in user_input:
             partial = user_input["destination_partial"]
-            def get_suggestions():
-                client_id, secret = self._get_credentials()
-                planner = JournyPlanner(client_id, secret)
-                return planner.location_name(partial)
             try:
-                suggestions = await self.hass.async_add_executor_job(get_suggestions)
+                suggestions = await self._async_get_suggestions(partial)
             except Exception as ex:
                 _LOGGER.error("Failed to fetch location suggestions: %s", ex)
                 errors["base"] = "location_error"
@@ -549,3 +589,85 @@ class VastraffikJourneyOptionsFlowHandler(config_entries.OptionsFlow):
             errors=errors,
             description_placeholders={"choices": str(choices)}
         )
+
+    async def async_step_add_board(self, user_input=None):
+        errors = {}
+        if user_input is not None and "from_partial" in user_input:
+            partial = user_input["from_partial"]
+            try:
+                suggestions = await self._async_get_suggestions(partial)
+            except Exception as ex:
+                _LOGGER.error("Failed to fetch location suggestions: %s", ex)
+                errors["base"] = "location_error"
+                suggestions = []
+            choices = {str(i): loc["name"] for i, loc in enumerate(suggestions)}
+            schema = vol.Schema({vol.Required("from_choice"): vol.In(list(choices.values()))})
+            return self.async_show_form(
+                step_id="add_board_from_select",
+                data_schema=schema,
+                errors=errors,
+                description_placeholders={"matches": ", ".join(choices.values())}
+            )
+        schema = vol.Schema({vol.Required("from_partial"): str})
+        return self.async_show_form(
+            step_id="add_board",
+            data_schema=schema,
+            errors=errors,
+        )
+
+    async def async_step_add_board_from_select(self, user_input=None):
+        if user_input is not None and "from_choice" in user_input:
+            self._current_board = {CONF_FROM: user_input["from_choice"]}
+            return await self.async_step_add_board_details()
+        return await self.async_step_add_board()
+
+    async def async_step_add_board_details(self, user_input=None):
+        errors = {}
+        # One destination sensor per heading, or per line when no headings are given
+        schema = vol.Schema({
+            vol.Optional(CONF_NAME): str,
+            vol.Optional(CONF_HEADING, default=""): str,
+            vol.Optional(CONF_LINES, default=""): str,
+        })
+        if user_input is not None:
+            # Repeats would give two destination sensors the same unique ID
+            headings = list(dict.fromkeys(h.strip() for h in user_input.get(CONF_HEADING, "").split(",") if h.strip()))
+            lines = list(dict.fromkeys(l.strip() for l in user_input.get(CONF_LINES, "").split(",") if l.strip()))
+            if headings:
+                destinations = [{CONF_HEADING: heading, CONF_LINES: lines} for heading in headings]
+            else:
+                destinations = [{CONF_NAME: line, CONF_LINES: [line]} for line in lines]
+            if not destinations:
+                errors["base"] = "no_destinations"
+            else:
+                board = self._current_board or {}
+                board[CONF_NAME] = user_input.get(CONF_NAME, "")
+                board[CONF_DESTINATIONS] = destinations
+                self.departure_boards.append(board)
+                self._current_board = None
+                return await self.async_step_menu()
+        return self.async_show_form(
+            step_id="add_board_details",
+            data_schema=schema,
+            errors=errors,
+        )
+
+    async def async_step_select_remove_board(self, user_input=None):
+        errors = {}
+        choices = {}
+        for i, board in enumerate(self.departure_boards):
+            label = board.get(CONF_NAME) or board.get(CONF_FROM) or f"Departure board {i+1}"
+            while label in choices:
+                label += f" ({i+1})"
+            choices[label] = i
+        schema = vol.Schema({vol.Required("remove_board_label"): vol.In(list(choices.keys()))})
+        if user_input is not None:
+            idx = choices[user_input["remove_board_label"]]
+            self.departure_boards.pop(idx)
+            return await self.async_step_menu()
+        return self.async_show_form(
+            step_id="select_remove_board",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders={"choices": str(choices)}
+        )
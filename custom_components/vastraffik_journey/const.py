@@ -0,0 +1,3 @@
+"""Constants for the Vastraffik Journey component."""
+
+DOMAIN = "vastraffik_journey"
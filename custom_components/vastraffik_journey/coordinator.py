@@ -0,0 +1,730 @@
+"""Shared trip query coordinator for Vastraffik Journey sensors."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+import logging
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util.dt import now, utcnow
+
+from .api import VasttrafikApiClient, VasttrafikApiError, VasttrafikCircuitOpenError
+from .const import DOMAIN
+from .gtfs_file import async_get_timetable
+from .metrics import QueryMetrics
+from .models import Departure, Journey
+from .parser import parse_departures, parse_journeys
+from .rate_limiter import PRIORITY_BULK, PRIORITY_REALTIME
+from .router import JourneyRouter
+from .stop_cache import StopNotFoundError, async_get_stop_cache
+from .trip_cache import DEFAULT_BUCKET, async_get_trip_cache
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_UPDATE_INTERVAL = timedelta(seconds=120)
+# Bounds of the per-query refresh interval of next-departure sensors, in seconds
+DEFAULT_MIN_POLL_INTERVAL = 30
+DEFAULT_MAX_POLL_INTERVAL = 900
+# Departures closer than this are always polled at the minimum interval
+IMMINENT_DEPARTURE = timedelta(minutes=10)
+# Fallback step when a window response gives nothing to continue from
+LIST_STEP = timedelta(minutes=5)
+# Hard cap on requests per window segment, in case the API stops advancing
+MAX_WINDOW_REQUESTS = 25
+# Journey list windows are split into segments of this length and fetched in parallel
+LIST_SEGMENT = timedelta(minutes=30)
+DEFAULT_LIST_CONCURRENCY = 4
+# Journeys departing within this slice are re-queried every cycle for realtime changes
+LIST_NEAR_TERM = timedelta(minutes=30)
+# The rest of a window only holds planned timetable data and is refreshed this often
+LIST_FAR_REFRESH = timedelta(minutes=30)
+# Above this many tracked journeys per query, one search is cheaper than their details
+MAX_TRACKED_DETAILS = 3
+# With a GTFS feed, trip queries only go to the API once a departure is this close
+GTFS_REALTIME_WINDOW = timedelta(minutes=15)
+# Journeys routed on the GTFS feed per trip query, before line filtering
+GTFS_JOURNEYS = 10
+# Minutes and number of departures a departure board request covers
+BOARD_TIME_SPAN = 60
+BOARD_DEPARTURES = 100
+
+
+class TripQuery(NamedTuple):
+    """A next-departure search, relative to the time of the refresh."""
+
+    origin_id: str
+    dest_id: str
+    delay: int  # minutes added to now()
+
+
+class WindowQuery(NamedTuple):
+    """A search covering every journey in a fixed time window of the day."""
+
+    origin_id: str
+    dest_id: str
+    start_time: str
+    end_time: str
+    time_relates_to: str
+
+
+class BoardQuery(NamedTuple):
+    """The departure board of one stop area, every line and direction."""
+
+    stop_id: str
+
+
+@dataclass
+class WindowState:
+    """Journeys already known for a window query on a given day."""
+
+    day: date
+    journeys: dict = field(default_factory=dict)
+    far_refreshed: datetime | None = None
+
+
+def journey_reference(journey: dict):
+    """Return a key identifying a journey across overlapping responses."""
+    ref = journey.get("detailsReference") or journey.get("reconstructionReference")
+    if ref:
+        return ref
+    legs = journey.get("tripLegs") or [{}]
+    line = (legs[0].get("serviceJourney") or {}).get("line") or {}
+    return (legs[0].get("plannedDepartureTime"), legs[-1].get("plannedArrivalTime"), line.get("shortName"))
+
+
+def journey_time(journey: dict, time_relates_to: str) -> datetime | None:
+    """Return the planned departure or arrival time of a whole journey."""
+    legs = journey.get("tripLegs")
+    if not legs:
+        return None
+    if time_relates_to == "arrival":
+        value = legs[-1].get("plannedArrivalTime")
+    else:
+        value = legs[0].get("plannedDepartureTime")
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _merge_journeys(answers) -> list[Journey]:
+    """Merge the routed journeys of several line filters, in departure order and without repeats."""
+    merged = {}
+    for journeys in answers:
+        for journey in journeys:
+            key = tuple((leg.line, leg.planned_departure, leg.planned_arrival) for leg in journey.legs)
+            merged.setdefault(key, journey)
+    return sorted(merged.values(), key=lambda journey: journey.departure)
+
+
+def merge_journey_details(journey: dict, details: dict) -> dict | None:
+    """Return a copy of a searched journey carrying the realtime times of its details.
+
+    Returns None if the details do not describe the same legs, in which case
+    the journey has to be searched for again.
+    """
+    legs = journey.get("tripLegs") or []
+    detail_legs = details.get("tripLegs") or []
+    if len(legs) != len(detail_legs):
+        return None
+    merged_legs = []
+    for leg, detail in zip(legs, detail_legs):
+        calls = detail.get("callsOnTripLeg") or [{}]
+        merged = dict(leg)
+        departure = detail.get("estimatedDepartureTime") or calls[0].get("estimatedDepartureTime")
+        arrival = detail.get("estimatedArrivalTime") or calls[-1].get("estimatedArrivalTime")
+        if departure:
+            merged["estimatedDepartureTime"] = departure
+        if arrival:
+            merged["estimatedArrivalTime"] = arrival
+        if detail.get("isCancelled") or calls[0].get("isCancelled") or calls[-1].get("isCancelled"):
+            merged["isCancelled"] = True
+        merged_legs.append(merged)
+    return {**journey, "tripLegs": merged_legs}
+
+
+def adaptive_poll_interval(until_departure: timedelta | None, deviation: bool, floor: timedelta, ceiling: timedelta) -> timedelta:
+    """Return the refresh interval for a departure that far away.
+
+    Polls at ``floor`` just before departure and backs off to a quarter of the
+    remaining time, or an eighth while realtime deviations are being seen,
+    never going beyond ``ceiling``.
+    """
+    if until_departure is None:
+        return ceiling
+    if until_departure <= IMMINENT_DEPARTURE:
+        return floor
+    interval = until_departure / (8 if deviation else 4)
+    return max(floor, min(ceiling, interval))
+
+
+def parse_clock_time(value: str):
+    """Return the time of day from 'HH:MM' or an RFC 3339 timestamp."""
+    value = value.strip()
+    if len(value) > 5:
+        return datetime.fromisoformat(value).time().replace(tzinfo=None)
+    return datetime.strptime(value, "%H:%M").time()
+
+
+class VasttrafikTripCoordinator(DataUpdateCoordinator):
+    """Fetch every distinct trip query of the subscribed sensors once per cycle.
+
+    Sensors subscribe with ``async_subscribe`` and expose a ``trip_query``, a
+    ``window_query`` or a ``board_query``. Identical queries from several
+    sensors are issued a single time, and each response is parsed once into
+    ``Journey`` or ``Departure`` objects shared through ``data``.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: VasttrafikApiClient,
+        name: str = DOMAIN,
+        update_interval=DEFAULT_UPDATE_INTERVAL,
+        list_concurrency: int = DEFAULT_LIST_CONCURRENCY,
+        trip_cache_bucket: int = DEFAULT_BUCKET,
+        min_poll_interval: int = DEFAULT_MIN_POLL_INTERVAL,
+        max_poll_interval: int = DEFAULT_MAX_POLL_INTERVAL,
+        gtfs_path: str | None = None,
+    ):
+        super().__init__(hass, _LOGGER, name=name, update_interval=update_interval)
+        self.client = client
+        self.min_poll_interval = timedelta(seconds=max(1, min_poll_interval))
+        self.max_poll_interval = max(self.min_poll_interval, timedelta(seconds=max_poll_interval))
+        # Window refreshes keep the fixed cadence the incremental sweep is built around
+        self._window_interval = update_interval
+        self.trip_cache = async_get_trip_cache(hass)
+        self._trip_cache_bucket = max(1, trip_cache_bucket)
+        # Bounds the window segment requests in flight at once, across all list sensors
+        self._list_semaphore = asyncio.Semaphore(max(1, list_concurrency))
+        self._subscribers: set = set()
+        self._stations: dict[str, str] = {}
+        self._pending_locations: set[str] = set()
+        self._windows: dict[WindowQuery, WindowState] = {}
+        # Results are kept per query and only re-fetched once the query is due
+        self._trip_results: dict[TripQuery, list | None] = {}
+        self._trip_journeys: dict[TripQuery, list[Journey] | None] = {}
+        self._window_results: dict[WindowQuery, list[Journey]] = {}
+        self._board_results: dict[BoardQuery, list[Departure] | None] = {}
+        self._due: dict[TripQuery | WindowQuery | BoardQuery, datetime] = {}
+        # Journeys the sensors of a trip query followed since its last full search
+        self._tracked: dict[TripQuery, frozenset[str]] = {}
+        self._query_metrics: dict[TripQuery | WindowQuery | BoardQuery, QueryMetrics] = {}
+        # Queries whose last refresh failed, and since when their results are served unchanged
+        self._stale_since: dict[TripQuery | WindowQuery | BoardQuery, datetime] = {}
+        self.last_refresh: datetime | None = None
+        self._gtfs_path = gtfs_path or None
+        self.router: JourneyRouter | None = None
+
+    @callback
+    def async_add_locations(self, locations) -> None:
+        """Queue location names to be resolved before the next refresh."""
+        for location in locations:
+            if location in self._stations:
+                continue
+            if location.isdecimal():
+                self._stations[location] = location
+            else:
+                self._pending_locations.add(location)
+
+    def station_id(self, location: str) -> str | None:
+        """Return the stop area GID of a location, or None until it is resolved."""
+        return self._stations.get(location)
+
+    async def _async_resolve_pending_locations(self) -> None:
+        if not self._pending_locations:
+            return
+        stop_cache = await async_get_stop_cache(self.hass)
+        pending = list(self._pending_locations)
+        results = await asyncio.gather(
+            *(stop_cache.async_resolve(self.client, location) for location in pending),
+            return_exceptions=True,
+        )
+        for location, result in zip(pending, results):
+            if isinstance(result, StopNotFoundError):
+                # Left pending; the stop cache warns once and only looks the name up again hourly
+                _LOGGER.debug("No stop matches %s", location)
+                continue
+            if isinstance(result, Exception):
+                # Left pending, the next refresh tries again
+                _LOGGER.warning("Unable to resolve stop %s: %s", location, result)
+                continue
+            self._stations[location] = result
+            self._pending_locations.discard(location)
+
+    @callback
+    def async_subscribe(self, entity):
+        """Register an entity whose queries should be fetched each cycle."""
+        self._subscribers.add(entity)
+
+        @callback
+        def _unsubscribe():
+            self._subscribers.discard(entity)
+
+        return _unsubscribe
+
+    @property
+    def subscribers(self) -> tuple:
+        """Return the subscribed entities."""
+        return tuple(self._subscribers)
+
+    def trip_results(self, query: TripQuery) -> list[Journey] | None:
+        """Return the journeys of the last cycle for a trip query."""
+        return (self.data or {}).get("trips", {}).get(query)
+
+    def window_results(self, query: WindowQuery) -> list[Journey] | None:
+        """Return the journeys of the last cycle for a window query."""
+        return (self.data or {}).get("windows", {}).get(query)
+
+    def board_results(self, query: BoardQuery) -> list[Departure] | None:
+        """Return the departures of the last cycle for a departure board query."""
+        return (self.data or {}).get("boards", {}).get(query)
+
+    def query_metrics(self, query: TripQuery | WindowQuery | BoardQuery) -> QueryMetrics | None:
+        """Return the refresh counters of a query, if it has been fetched."""
+        return self._query_metrics.get(query)
+
+    def stale_since(self, query: TripQuery | WindowQuery | BoardQuery | None) -> datetime | None:
+        """Return when refreshing a query started failing, while its last good results are served."""
+        return self._stale_since.get(query)
+
+    def _collect_queries(self):
+        trips = set()
+        windows = set()
+        boards = set()
+        for entity in self._subscribers:
+            if getattr(entity, "paused", False):
+                continue
+            trip_query = getattr(entity, "trip_query", None)
+            if trip_query is not None:
+                trips.add(trip_query)
+            window_query = getattr(entity, "window_query", None)
+            if window_query is not None:
+                windows.add(window_query)
+            board_query = getattr(entity, "board_query", None)
+            if board_query is not None:
+                boards.add(board_query)
+        return trips, windows, boards
+
+    def _query_interval(self, query: TripQuery | BoardQuery, results: list | None) -> timedelta:
+        """Return the shortest refresh interval any subscriber of a query asks for."""
+        if results is None:
+            # The request failed: retry at the regular cadence, or once the endpoint's circuit lets requests through
+            retry_in = self.client.breakers.retry_in("departures" if isinstance(query, BoardQuery) else "journeys")
+            interval = timedelta(seconds=retry_in) if retry_in else DEFAULT_UPDATE_INTERVAL
+            return max(self.min_poll_interval, min(self.max_poll_interval, interval))
+        attribute = "board_query" if isinstance(query, BoardQuery) else "trip_query"
+        intervals = [
+            entity.desired_interval(results)
+            for entity in self._subscribers
+            if getattr(entity, attribute, None) == query and hasattr(entity, "desired_interval")
+        ]
+        return min(intervals, default=self.max_poll_interval)
+
+    def _tracked_references(self, query: TripQuery) -> frozenset[str] | None:
+        """Return the details references the sensors of a query show, if they all have one."""
+        refs = set()
+        for entity in self._subscribers:
+            if getattr(entity, "trip_query", None) != query or getattr(entity, "paused", False):
+                continue
+            ref = getattr(entity, "tracked_reference", None)
+            if ref is None:
+                return None
+            refs.add(ref)
+        return frozenset(refs) or None
+
+    async def _async_load_timetable(self) -> None:
+        if self._gtfs_path is None or self.router is not None:
+            return
+        try:
+            # Relative paths are relative to the HA configuration directory
+            timetable = await async_get_timetable(self.hass, self.hass.config.path(self._gtfs_path))
+        except Exception as ex:  # noqa: BLE001 - any broken feed falls back to the API
+            _LOGGER.warning("Unable to load GTFS feed %s, using the API only: %s", self._gtfs_path, ex)
+            self._gtfs_path = None
+            return
+        self.router = JourneyRouter(timetable)
+
+    def _line_filters(self, query: TripQuery | WindowQuery, attribute: str) -> set[frozenset[str] | None]:
+        """Return the line filters of a query's subscribers, None standing for every line."""
+        filters = {
+            frozenset(lines) if (lines := getattr(entity, "lines", None)) else None
+            for entity in self._subscribers
+            if getattr(entity, attribute, None) == query
+        }
+        return filters or {None}
+
+    def _offline_answers(self, due_trips: list[TripQuery], due_windows: list[WindowQuery], filters: dict) -> dict:
+        """Route the queries the GTFS feed can answer; runs in the executor."""
+        offline = {}
+        for query in due_trips:
+            offline[query] = self._offline_trip(query, filters[query])
+        for query in due_windows:
+            offline[query] = self._offline_window(query, filters[query])
+        return {query: journeys for query, journeys in offline.items() if journeys is not None}
+
+    def _offline_trip(self, query: TripQuery, filters: set[frozenset[str] | None]) -> list[Journey] | None:
+        """Answer a trip query from the GTFS feed while no departure needs realtime data.
+
+        Each line filter of the subscribers is routed on its own, so a
+        sensor gets its own next journeys rather than those left of the
+        first GTFS_JOURNEYS on any line. Returns None when the feed does not
+        know the stops; no journeys at all is an answer too.
+        """
+        if not self.router.knows(query.origin_id, query.dest_id):
+            return None
+        current = now()
+        after = current + timedelta(minutes=query.delay)
+        journeys = _merge_journeys(
+            self.router.journeys(query.origin_id, query.dest_id, after, lines=lines, limit=GTFS_JOURNEYS)
+            for lines in filters
+        )
+        if journeys and journeys[0].departure - current.timestamp() <= GTFS_REALTIME_WINDOW.total_seconds():
+            return None
+        return journeys
+
+    def _offline_window(self, query: WindowQuery, filters: set[frozenset[str] | None]) -> list[Journey] | None:
+        """Answer a window query from the GTFS feed; list sensors only show planned times.
+
+        Returns None when the feed does not know the stops. A window that has
+        ended, or has no service, is answered with no journeys.
+        """
+        if not self.router.knows(query.origin_id, query.dest_id):
+            return None
+        now_dt, start_dt, end_dt = self._window_bounds(query)
+        return _merge_journeys(
+            self.router.journeys_between(
+                query.origin_id, query.dest_id, max(start_dt, now_dt), end_dt, query.time_relates_to, lines=lines
+            )
+            for lines in filters
+        )
+
+    async def _async_update_data(self) -> dict[str, dict[Any, list]]:
+        await self._async_resolve_pending_locations()
+        await self._async_load_timetable()
+        trips, windows, boards = self._collect_queries()
+        current = now()
+        # Forget queries no subscriber asks for any more
+        for cache, active in (
+            (self._trip_results, trips),
+            (self._trip_journeys, trips),
+            (self._tracked, trips),
+            (self._window_results, windows),
+            (self._windows, windows),
+            (self._board_results, boards),
+        ):
+            for query in [q for q in cache if q not in active]:
+                del cache[query]
+                self._due.pop(query, None)
+                self._query_metrics.pop(query, None)
+                self._stale_since.pop(query, None)
+        due_trips = [q for q in trips if q not in self._trip_results or self._due.get(q, current) <= current]
+        due_windows = [q for q in windows if q not in self._window_results or self._due.get(q, current) <= current]
+        due_boards = [q for q in boards if q not in self._board_results or self._due.get(q, current) <= current]
+        _LOGGER.debug(
+            "Fetching %d of %d trip, %d of %d window and %d of %d board queries for %d subscribers",
+            len(due_trips), len(trips), len(due_windows), len(windows), len(due_boards), len(boards),
+            len(self._subscribers),
+        )
+        offline = {}
+        if self.router is not None and (due_trips or due_windows):
+            filters = {
+                **{query: self._line_filters(query, "trip_query") for query in due_trips},
+                **{query: self._line_filters(query, "window_query") for query in due_windows},
+            }
+            offline = await self.hass.async_add_executor_job(self._offline_answers, due_trips, due_windows, filters)
+            due_trips = [q for q in due_trips if q not in offline]
+            due_windows = [q for q in due_windows if q not in offline]
+        results = await asyncio.gather(
+            *(self._async_fetch_trip(q) for q in due_trips),
+            *(self._async_fetch_window(q) for q in due_windows),
+            *(self._async_fetch_board(q) for q in due_boards),
+        )
+        for query, journeys in offline.items():
+            if isinstance(query, TripQuery):
+                # Nothing to merge realtime details into, the next API refresh searches
+                self._trip_results[query] = []
+                self._tracked.pop(query, None)
+                self._trip_journeys[query] = journeys
+                self._due[query] = current + self._query_interval(query, journeys)
+            else:
+                self._window_results[query] = journeys
+                self._due[query] = current + self._window_interval
+        # Failed queries keep serving their last results; sensors skip what has departed since
+        failed = set()
+        for query, result in zip(due_trips, results[:len(due_trips)]):
+            if result is None:
+                failed.add(query)
+                self._trip_results.setdefault(query, None)
+                self._trip_journeys.setdefault(query, None)
+                self._due[query] = current + self._query_interval(query, None)
+                continue
+            # Raw results are kept so tracked journeys can be merged with their details
+            self._trip_results[query] = result
+            journeys = self._trip_journeys[query] = parse_journeys(result)
+            self._due[query] = current + self._query_interval(query, journeys)
+        for query, (result, complete) in zip(due_windows, results[len(due_trips):]):
+            if not complete:
+                failed.add(query)
+            self._window_results[query] = parse_journeys(result)
+            self._due[query] = current + self._window_interval
+        for query, departures in zip(due_boards, results[len(due_trips) + len(due_windows):]):
+            if departures is None:
+                failed.add(query)
+                self._board_results.setdefault(query, None)
+            else:
+                self._board_results[query] = departures
+            self._due[query] = current + self._query_interval(query, departures)
+        refreshed = utcnow()
+        for query in [*due_trips, *due_windows, *due_boards, *offline]:
+            metrics = self._query_metrics.get(query)
+            if metrics is None:
+                metrics = self._query_metrics[query] = QueryMetrics()
+            metrics.fetches += 1
+            if query in failed:
+                metrics.failures += 1
+                self._stale_since.setdefault(query, current)
+            else:
+                metrics.last_success = refreshed
+                self._stale_since.pop(query, None)
+                if query in offline:
+                    metrics.offline += 1
+        self.last_refresh = refreshed
+        # Wake up again when the next query is due
+        next_due = min(self._due.values(), default=current + self.max_poll_interval)
+        self.update_interval = max(self.min_poll_interval, min(self.max_poll_interval, next_due - current))
+        return {
+            "trips": dict(self._trip_journeys),
+            "windows": dict(self._window_results),
+            "boards": dict(self._board_results),
+        }
+
+    async def _async_fetch_trip(self, query: TripQuery):
+        """Return the journeys of a trip query.
+
+        While the sensors keep showing the journeys they showed after the
+        last search, only those journeys' realtime details are fetched. A new
+        search runs once one of them has departed or is cancelled.
+        """
+        previous = self._trip_results.get(query)
+        tracked = self._tracked_references(query)
+        if previous and tracked and len(tracked) <= MAX_TRACKED_DETAILS:
+            if query not in self._tracked:
+                # First refresh since the search: remember what the sensors picked
+                self._tracked[query] = tracked
+            if self._tracked[query] == tracked:
+                refreshed = await self._async_refresh_tracked(
+                    previous, tracked, now() + timedelta(minutes=query.delay)
+                )
+                if refreshed is not None:
+                    return refreshed
+        self._tracked.pop(query, None)
+        try:
+            results, _ = await self._async_trip_page(
+                query.origin_id,
+                query.dest_id,
+                now() + timedelta(minutes=query.delay),
+            )
+            return results
+        except VasttrafikApiError as ex:
+            _LOGGER.debug("Unable to read journeys: %s", ex)
+            return None
+
+    async def _async_fetch_board(self, query: BoardQuery) -> list[Departure] | None:
+        """Return the upcoming departures of a stop area, or None if the request failed."""
+        try:
+            results = await self.client.async_departures(
+                query.stop_id, time_span=BOARD_TIME_SPAN, limit=BOARD_DEPARTURES
+            )
+        except VasttrafikApiError as ex:
+            _LOGGER.debug("Unable to read departures: %s", ex)
+            return None
+        return parse_departures(results)
+
+    async def _async_refresh_tracked(self, journeys: list, tracked: frozenset[str], earliest: datetime) -> list | None:
+        """Update the tracked journeys from their details, or return None if a search is needed.
+
+        A search is also needed once a tracked journey leaves before ``earliest``,
+        the time the query's sensors can still reach a departure.
+        """
+        refs = list(tracked)
+        try:
+            details = await asyncio.gather(*(self.client.async_journey_details(ref) for ref in refs))
+        except VasttrafikApiError as ex:
+            _LOGGER.debug("Unable to read journey details: %s", ex)
+            return None
+        by_ref = dict(zip(refs, details))
+        refreshed = []
+        for journey in journeys:
+            ref = journey.get("detailsReference")
+            if ref in by_ref:
+                journey = merge_journey_details(journey, by_ref[ref])
+                if journey is None:
+                    return None
+                legs = journey["tripLegs"]
+                if any(leg.get("isCancelled") for leg in legs):
+                    return None
+                departure = legs[0].get("estimatedDepartureTime") or legs[0].get("plannedDepartureTime")
+                try:
+                    if departure and datetime.fromisoformat(departure) < earliest:
+                        return None
+                except ValueError:
+                    pass
+            refreshed.append(journey)
+        return refreshed
+
+    async def _async_trip_page(
+        self, origin_id, dest_id, date, time_relates_to=None, pagination_reference=None, priority=PRIORITY_REALTIME
+    ):
+        """Search journeys, answering from the shared trip cache when possible."""
+        key = None
+        if pagination_reference is None:
+            key = self.trip_cache.key(origin_id, dest_id, date, time_relates_to, self._trip_cache_bucket)
+            page = self.trip_cache.get(key)
+            if page is not None:
+                return page
+        page = await self.client.async_trip_page(
+            origin_id,
+            dest_id,
+            date=date,
+            date_time_relates_to=time_relates_to,
+            pagination_reference=pagination_reference,
+            priority=priority,
+        )
+        if key is not None:
+            self.trip_cache.put(key, page)
+        return page
+
+    @staticmethod
+    def _window_bounds(query: WindowQuery) -> tuple[datetime, datetime, datetime]:
+        """Return the current minute and today's start and end of a window."""
+        now_dt = now().replace(second=0, microsecond=0)
+        today = now_dt.date()
+        start_dt = datetime.combine(today, parse_clock_time(query.start_time), tzinfo=now_dt.tzinfo)
+        end_dt = datetime.combine(today, parse_clock_time(query.end_time), tzinfo=now_dt.tzinfo)
+        return now_dt, start_dt, end_dt
+
+    async def _async_fetch_window(self, query: WindowQuery) -> tuple[list, bool]:
+        """Return the window's journeys and whether every request succeeded.
+
+        Only what may have changed is re-queried: departed journeys are
+        dropped locally, the near-term slice is re-queried every cycle and
+        the far part of the window only every LIST_FAR_REFRESH. A new day
+        starts over with a full fetch.
+        """
+        now_dt, start_dt, end_dt = self._window_bounds(query)
+        today = now_dt.date()
+        state = self._windows.get(query)
+        complete = True
+        if state is None or state.day != today:
+            state = self._windows[query] = WindowState(today)
+            # What has already departed is of no use, e.g. after a restart mid-window
+            complete = await self._async_refresh_range(query, state, max(start_dt, now_dt), end_dt)
+            if complete:
+                state.far_refreshed = now_dt
+        else:
+            near_start = max(start_dt, now_dt)
+            near_end = min(end_dt, now_dt + LIST_NEAR_TERM)
+            if near_start <= near_end:
+                complete = await self._async_refresh_range(query, state, near_start, near_end)
+            far_start = max(start_dt, near_end + timedelta(minutes=1))
+            if far_start <= end_dt and (state.far_refreshed is None or now_dt - state.far_refreshed >= LIST_FAR_REFRESH):
+                if await self._async_refresh_range(query, state, far_start, end_dt):
+                    state.far_refreshed = now_dt
+                else:
+                    complete = False
+        state.journeys = {
+            ref: journey for ref, journey in state.journeys.items()
+            if (journey_time(journey, "departure") or now_dt) >= now_dt
+        }
+        journeys = sorted(
+            state.journeys.values(),
+            key=lambda j: journey_time(j, query.time_relates_to) or start_dt,
+        )
+        return journeys, complete
+
+    async def _async_refresh_range(self, query: WindowQuery, state: WindowState, start_dt: datetime, end_dt: datetime) -> bool:
+        """Replace the known journeys of a time range with freshly fetched ones.
+
+        Returns False if some request failed, in which case the known
+        journeys of the range are kept alongside whatever was fetched.
+        """
+        segments = []
+        seg_start = start_dt
+        while seg_start <= end_dt:
+            seg_end = min(seg_start + LIST_SEGMENT, end_dt)
+            segments.append((seg_start, seg_end))
+            seg_start = seg_end + timedelta(minutes=1)
+        results = await asyncio.gather(
+            *(self._async_sweep_segment(query, seg_start, seg_end) for seg_start, seg_end in segments)
+        )
+        complete = all(segment_complete for _, segment_complete in results)
+        if complete:
+            # Journeys in the range that are gone from the new responses were removed upstream
+            def in_range(journey):
+                when = journey_time(journey, query.time_relates_to)
+                return when is not None and start_dt <= when <= end_dt
+
+            state.journeys = {ref: j for ref, j in state.journeys.items() if not in_range(j)}
+        # Segments share their boundary minute, so de-duplicate again
+        for segment, _ in results:
+            state.journeys.update(segment)
+        return complete
+
+    async def _async_sweep_segment(self, query: WindowQuery, start_dt: datetime, end_dt: datetime) -> tuple[dict, bool]:
+        async with self._list_semaphore:
+            return await self._async_sweep(query, start_dt, end_dt)
+
+    async def _async_sweep(self, query: WindowQuery, start_dt: datetime, end_dt: datetime) -> tuple[dict, bool]:
+        """Fetch the journeys of a segment and whether every request succeeded."""
+        # Each request continues just past the last journey of the previous one,
+        # following the API's paging cursor when it hands one out.
+        journeys = {}
+        complete = True
+        dt = start_dt
+        cursor = None
+        requests = 0
+        while dt <= end_dt and requests < MAX_WINDOW_REQUESTS:
+            requests += 1
+            try:
+                results, cursor = await self._async_trip_page(
+                    query.origin_id,
+                    query.dest_id,
+                    dt,
+                    query.time_relates_to,
+                    cursor,
+                    PRIORITY_BULK,
+                )
+            except VasttrafikCircuitOpenError as ex:
+                # The rest of the segment would fail the same way
+                _LOGGER.debug("Stopping window sweep at %s: %s", dt, ex)
+                complete = False
+                break
+            except Exception as ex:
+                _LOGGER.debug("Failed to fetch journeys at %s: %s", dt, ex)
+                complete = False
+                cursor = None
+                dt += LIST_STEP
+                continue
+            latest = None
+            for journey in results:
+                when = journey_time(journey, query.time_relates_to)
+                if when is not None and (latest is None or when > latest):
+                    latest = when
+                if when is not None and not start_dt <= when <= end_dt:
+                    continue
+                journeys.setdefault(journey_reference(journey), journey)
+            if latest is None or latest < dt:
+                # Nothing to continue from, fall back to a fixed step
+                cursor = None
+                dt += LIST_STEP
+            elif cursor is None:
+                dt = latest + timedelta(minutes=1)
+            else:
+                dt = latest
+        _LOGGER.debug("Window segment %s-%s of %s covered with %d requests", start_dt, end_dt, query, requests)
+        return journeys, complete
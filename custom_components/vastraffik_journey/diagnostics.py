@@ -0,0 +1,66 @@
+"""Diagnostics support for Vastraffik Journey."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import VasttrafikTripCoordinator
+from .rate_limiter import DATA_RATE_LIMITER
+from .sensor import CONF_CLIENT_ID, CONF_SECRET
+from .stop_cache import DATA_STOP_CACHE
+from .trip_cache import DATA_TRIP_CACHE
+
+TO_REDACT = {CONF_CLIENT_ID, CONF_SECRET}
+
+
+def _subscriber_diagnostics(coordinator: VasttrafikTripCoordinator, entity) -> dict[str, Any]:
+    query = (
+        getattr(entity, "trip_query", None)
+        or getattr(entity, "window_query", None)
+        or getattr(entity, "board_query", None)
+    )
+    metrics = coordinator.query_metrics(query) if query is not None else None
+    return {
+        "entity_id": entity.entity_id,
+        "unique_id": entity.unique_id,
+        "paused": getattr(entity, "paused", False),
+        "query": query._asdict() if query is not None else None,
+        "refresh": metrics.as_dict() if metrics is not None else None,
+        "stale_since": stale_since.isoformat() if (stale_since := coordinator.stale_since(query)) else None,
+    }
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return API usage, cache and refresh diagnostics of a config entry."""
+    domain_data = hass.data[DOMAIN]
+    coordinator: VasttrafikTripCoordinator = domain_data[entry.entry_id]
+    client = coordinator.client
+    stop_cache = domain_data.get(DATA_STOP_CACHE)
+    rate_limiter = domain_data.get(DATA_RATE_LIMITER)
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "coordinator": {
+            "last_refresh": coordinator.last_refresh.isoformat() if coordinator.last_refresh else None,
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+        },
+        "api": {
+            "endpoints": client.metrics.as_dict(),
+            "token_renewals": client.token_renewals,
+            "rate_limiter_queued": rate_limiter.queued if rate_limiter is not None else None,
+            "circuit_breakers": client.breakers.as_dict(),
+        },
+        "caches": {
+            "trips": domain_data[DATA_TRIP_CACHE].stats() if DATA_TRIP_CACHE in domain_data else None,
+            "stops": stop_cache.stats() if stop_cache is not None else None,
+        },
+        "sensors": [_subscriber_diagnostics(coordinator, entity) for entity in coordinator.subscribers],
+    }
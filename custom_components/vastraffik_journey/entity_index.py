@@ -0,0 +1,55 @@
+"""Index of the entities of this integration by unique_id and entity_id."""
+
+from __future__ import annotations
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.entity import Entity
+
+from .const import DOMAIN
+from .util import domain_singleton
+
+DATA_ENTITY_INDEX = "entity_index"
+# Sent with the new pause state of a journey sensor, formatted with its unique_id
+SIGNAL_PAUSE_CHANGED = f"{DOMAIN}_pause_changed_{{}}"
+
+
+@callback
+def async_get_entity_index(hass: HomeAssistant) -> EntityIndex:
+    """Return the index of loaded sensors by unique ID."""
+    return domain_singleton(hass, DATA_ENTITY_INDEX, EntityIndex)
+
+
+class EntityIndex:
+    """Entities added to HA, so services and switches find them without scanning.
+
+    Entities register themselves in ``async_added_to_hass`` and are dropped
+    again through the returned callback when they are removed.
+    """
+
+    def __init__(self):
+        self._by_unique_id: dict[str, Entity] = {}
+        self._by_entity_id: dict[str, Entity] = {}
+
+    @callback
+    def async_add(self, entity: Entity) -> CALLBACK_TYPE:
+        """Index an entity and return a callback removing it again."""
+        unique_id = entity.unique_id
+        entity_id = entity.entity_id
+        if unique_id is not None:
+            self._by_unique_id[unique_id] = entity
+        self._by_entity_id[entity_id] = entity
+
+        @callback
+        def _remove():
+            if unique_id is not None and self._by_unique_id.get(unique_id) is entity:
+                del self._by_unique_id[unique_id]
+            if self._by_entity_id.get(entity_id) is entity:
+                del self._by_entity_id[entity_id]
+
+        return _remove
+
+    def get(self, unique_id: str) -> Entity | None:
+        return self._by_unique_id.get(unique_id)
+
+    def get_by_entity_id(self, entity_id: str) -> Entity | None:
+        return self._by_entity_id.get(entity_id)
@@ -0,0 +1,241 @@
+"""Västtrafik GTFS static feeds held in flat arrays for offline journey planning."""
+
+from __future__ import annotations
+
+from array import array
+import csv
+from datetime import date
+import io
+import logging
+from pathlib import Path
+import zipfile
+
+from .models import Leg
+
+_LOGGER = logging.getLogger(__name__)
+
+# Departures looked at per stop area and service day before giving up
+MAX_SCAN = 5000
+# Service days whose active services are kept computed
+SERVICE_DAY_CACHE = 3
+
+
+def _seconds(value: str) -> int:
+    """Return a GTFS 'H:MM:SS' time, which may pass 24:00:00, as seconds."""
+    hours, minutes, seconds = value.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+def _gtfs_date(value: str) -> date:
+    return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+
+
+def _rows(feed: zipfile.ZipFile, name: str):
+    if name not in feed.namelist():
+        return
+    with feed.open(name) as raw:
+        yield from csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+
+
+class ServiceCalendar:
+    """Which services run on which day, from calendar.txt and calendar_dates.txt."""
+
+    def __init__(self, count: int, weekly: dict[int, tuple[int, date, date]], added: dict[date, list[int]], removed: dict[date, list[int]]):
+        self.count = count
+        self._weekly = weekly  # service -> (weekday bit mask, first day, last day)
+        self._added = added
+        self._removed = removed
+        self._cache: dict[date, bytearray] = {}
+
+    def active(self, day: date) -> bytearray:
+        """Return one flag per service, set when it runs on ``day``."""
+        flags = self._cache.get(day)
+        if flags is not None:
+            return flags
+        flags = bytearray(self.count)
+        bit = 1 << day.weekday()
+        for service, (mask, first, last) in self._weekly.items():
+            if mask & bit and first <= day <= last:
+                flags[service] = 1
+        for service in self._added.get(day, ()):
+            flags[service] = 1
+        for service in self._removed.get(day, ()):
+            flags[service] = 0
+        if len(self._cache) >= SERVICE_DAY_CACHE:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[day] = flags
+        return flags
+
+    def date_range(self) -> tuple[date | None, date | None]:
+        """Return the first and last day any service runs on, or Nones for an empty calendar."""
+        days = [day for _, first, last in self._weekly.values() for day in (first, last)]
+        days += [*self._added, *self._removed]
+        if not days:
+            return None, None
+        return min(days), max(days)
+
+
+class GtfsTimetable:
+    """Stops, trips and stop times held in flat arrays.
+
+    Stop times are ordered by trip and stop sequence, so the rest of a trip
+    after any stop time is the following rows up to ``trip_offsets[trip + 1]``.
+    Every stop area (the parent station, which uses the same GID as the
+    Travel Planner) has its stop time rows listed by departure time in
+    ``area_rows[area_offsets[area]:area_offsets[area + 1]]``.
+
+    Columns are arrays when loaded from a zip, or views into a compiled file
+    (see ``gtfs_file``).
+    """
+
+    def __init__(
+        self,
+        stop_names: list[str],
+        stop_area: array,
+        area_ids: list[str],
+        area_offsets: array,
+        area_rows: array,
+        trip_offsets: array,
+        trip_route: array,
+        trip_service: array,
+        trip_headsigns: list[str],
+        route_names: list[str],
+        st_trip: array,
+        st_stop: array,
+        st_arrival: array,
+        st_departure: array,
+        calendar: ServiceCalendar,
+    ):
+        self.stop_names = stop_names
+        self.stop_area = stop_area
+        self.area_ids = area_ids
+        self.area_offsets = area_offsets
+        self.area_rows = area_rows
+        self.trip_offsets = trip_offsets
+        self.trip_route = trip_route
+        self.trip_service = trip_service
+        self.trip_headsigns = trip_headsigns
+        self.route_names = route_names
+        self.st_trip = st_trip
+        self.st_stop = st_stop
+        self.st_arrival = st_arrival
+        self.st_departure = st_departure
+        self.calendar = calendar
+        self._area_index = {gid: idx for idx, gid in enumerate(area_ids)}
+
+    @classmethod
+    def from_zip(cls, path: Path) -> GtfsTimetable:
+        with zipfile.ZipFile(path) as feed:
+            return cls._from_feed(feed)
+
+    @classmethod
+    def _from_feed(cls, feed: zipfile.ZipFile) -> GtfsTimetable:
+        stop_ids: dict[str, int] = {}
+        stop_names: list[str] = []
+        parents: list[str] = []
+        for row in _rows(feed, "stops.txt"):
+            stop_ids[row["stop_id"]] = len(stop_names)
+            stop_names.append(row["stop_name"])
+            parents.append(row.get("parent_station") or row["stop_id"])
+        area_index: dict[str, int] = {}
+        stop_area = array("i", (area_index.setdefault(parent, len(area_index)) for parent in parents))
+        area_ids = list(area_index)
+
+        route_index: dict[str, int] = {}
+        route_names: list[str] = []
+        for row in _rows(feed, "routes.txt"):
+            route_index[row["route_id"]] = len(route_names)
+            route_names.append(row.get("route_short_name") or row.get("route_long_name") or "")
+
+        service_index: dict[str, int] = {}
+        trip_index: dict[str, int] = {}
+        trip_route = array("i")
+        trip_service = array("i")
+        trip_headsigns: list[str] = []
+        for row in _rows(feed, "trips.txt"):
+            trip_index[row["trip_id"]] = len(trip_route)
+            trip_route.append(route_index[row["route_id"]])
+            trip_service.append(service_index.setdefault(row["service_id"], len(service_index)))
+            trip_headsigns.append(row.get("trip_headsign") or "")
+
+        weekly = {}
+        weekdays = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+        for row in _rows(feed, "calendar.txt"):
+            service = service_index.setdefault(row["service_id"], len(service_index))
+            mask = sum(1 << bit for bit, day in enumerate(weekdays) if row[day] == "1")
+            weekly[service] = (mask, _gtfs_date(row["start_date"]), _gtfs_date(row["end_date"]))
+        added: dict[date, list[int]] = {}
+        removed: dict[date, list[int]] = {}
+        for row in _rows(feed, "calendar_dates.txt"):
+            service = service_index.setdefault(row["service_id"], len(service_index))
+            target = added if row["exception_type"] == "1" else removed
+            target.setdefault(_gtfs_date(row["date"]), []).append(service)
+
+        trips = array("i")
+        sequences = array("i")
+        st_stop = array("i")
+        st_arrival = array("i")
+        st_departure = array("i")
+        for row in _rows(feed, "stop_times.txt"):
+            trips.append(trip_index[row["trip_id"]])
+            sequences.append(int(row["stop_sequence"]))
+            st_stop.append(stop_ids[row["stop_id"]])
+            arrival = row["arrival_time"] or row["departure_time"]
+            st_arrival.append(_seconds(arrival))
+            st_departure.append(_seconds(row["departure_time"] or arrival))
+        _LOGGER.debug("Loaded %d stop times of %d trips", len(st_stop), len(trip_route))
+
+        order = sorted(range(len(trips)), key=lambda r: (trips[r], sequences[r]))
+        st_trip = array("i", (trips[r] for r in order))
+        st_stop = array("i", (st_stop[r] for r in order))
+        st_arrival = array("i", (st_arrival[r] for r in order))
+        st_departure = array("i", (st_departure[r] for r in order))
+        trip_offsets = array("i", bytes(4 * (len(trip_route) + 1)))
+        for trip in st_trip:
+            trip_offsets[trip + 1] += 1
+        for trip in range(len(trip_route)):
+            trip_offsets[trip + 1] += trip_offsets[trip]
+        del order, trips, sequences
+
+        area_order = sorted(range(len(st_stop)), key=lambda r: (stop_area[st_stop[r]], st_departure[r]))
+        area_rows = array("i", area_order)
+        area_offsets = array("i", bytes(4 * (len(area_ids) + 1)))
+        for r in area_order:
+            area_offsets[stop_area[st_stop[r]] + 1] += 1
+        for area in range(len(area_ids)):
+            area_offsets[area + 1] += area_offsets[area]
+
+        return cls(
+            stop_names,
+            stop_area,
+            area_ids,
+            area_offsets,
+            area_rows,
+            trip_offsets,
+            trip_route,
+            trip_service,
+            trip_headsigns,
+            route_names,
+            st_trip,
+            st_stop,
+            st_arrival,
+            st_departure,
+            ServiceCalendar(len(service_index), weekly, added, removed),
+        )
+
+    def area(self, gid: str) -> int | None:
+        """Return the index of a stop area GID, or None if the feed does not know it."""
+        return self._area_index.get(gid)
+
+    def leg(self, trip: int, board: int, alight: int, midnight: int) -> Leg:
+        """Return the leg riding ``trip`` from stop time row ``board`` to ``alight``."""
+        return Leg(
+            self.route_names[self.trip_route[trip]],
+            self.trip_headsigns[trip],
+            self.stop_names[self.st_stop[board]],
+            self.stop_names[self.st_stop[alight]],
+            midnight + self.st_departure[board],
+            None,
+            midnight + self.st_arrival[alight],
+            None,
+        )
@@ -0,0 +1,276 @@
+"""Compiled, memory-mapped timetable files.
+
+Parsing a region-wide GTFS feed into Python objects takes seconds and a lot
+of memory. A feed is therefore compiled once into a binary columnar file,
+which later starts only map: the columns are read straight out of the page
+cache, so a lookup only touches the pages it needs.
+
+The file starts with a header and a table of named sections, each aligned to
+8 bytes. Integer columns are native int32 arrays, string columns are an
+int32 offset array plus UTF-8 data, and service days are one bitmap per
+service, one bit per day from the first day of the feed.
+
+Compile on a faster machine with::
+
+    python -m custom_components.vastraffik_journey.gtfs_file feed.zip feed.zip.timetable
+"""
+
+from __future__ import annotations
+
+from array import array
+import asyncio
+from datetime import date, timedelta
+import logging
+import mmap
+from pathlib import Path
+import struct
+import sys
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .gtfs import SERVICE_DAY_CACHE, GtfsTimetable, ServiceCalendar
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_TIMETABLES = "timetables"
+
+MAGIC = b"VTJT"
+VERSION = 1
+COMPILED_SUFFIX = ".timetable"
+_HEADER = struct.Struct("<4sIBI")  # magic, version, little endian flag, section count
+_SECTION = struct.Struct("<24sQQ")  # name, offset, length
+_ALIGN = 8
+_LITTLE = sys.byteorder == "little"
+
+_INT_COLUMNS = (
+    "stop_area",
+    "area_offsets",
+    "area_rows",
+    "trip_offsets",
+    "trip_route",
+    "trip_service",
+    "st_trip",
+    "st_stop",
+    "st_arrival",
+    "st_departure",
+)
+_STRING_COLUMNS = ("stop_names", "area_ids", "route_names")
+
+
+async def async_get_timetable(hass: HomeAssistant, path: str) -> GtfsTimetable:
+    """Return the timetable of a feed, loading it in the executor on first use.
+
+    Entries pointing at the same file share one timetable.
+    """
+    timetables = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_TIMETABLES, {})
+    if path not in timetables:
+        timetables[path] = hass.async_create_task(hass.async_add_executor_job(load_timetable, path))
+    task = timetables[path]
+    try:
+        return await asyncio.shield(task)
+    except Exception:
+        # Let the next refresh try again, e.g. once the file has been fixed
+        if timetables.get(path) is task:
+            del timetables[path]
+        raise
+
+
+def load_timetable(path: str) -> GtfsTimetable:
+    """Open a compiled timetable, compiling a GTFS zip next to itself first if needed."""
+    source = Path(path)
+    if is_compiled(source):
+        return open_timetable(source)
+    compiled = source.with_name(source.name + COMPILED_SUFFIX)
+    if not _is_current(compiled, source):
+        _LOGGER.info("Compiling GTFS feed %s to %s", source, compiled)
+        compile_timetable(GtfsTimetable.from_zip(source), compiled)
+    return open_timetable(compiled)
+
+
+def _is_current(compiled: Path, source: Path) -> bool:
+    try:
+        if compiled.stat().st_mtime < source.stat().st_mtime:
+            return False
+    except FileNotFoundError:
+        return False
+    return is_compiled(compiled)
+
+
+def is_compiled(path: Path) -> bool:
+    """Return True for a compiled timetable of this version and byte order."""
+    with path.open("rb") as file:
+        header = file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return False
+    magic, version, little, _ = _HEADER.unpack(header)
+    return magic == MAGIC and version == VERSION and bool(little) == _LITTLE
+
+
+def _ints(values) -> bytes:
+    return values.tobytes() if isinstance(values, array) else array("i", values).tobytes()
+
+
+def _strings(values) -> tuple[bytes, bytes]:
+    offsets = array("i", [0])
+    data = bytearray()
+    for value in values:
+        data += value.encode()
+        offsets.append(len(data))
+    return offsets.tobytes(), bytes(data)
+
+
+def _calendar_bitmaps(calendar: ServiceCalendar) -> tuple[bytes, bytes]:
+    first, last = calendar.date_range()
+    days = (last - first).days + 1 if first else 0
+    row_bytes = (days + 7) // 8
+    bits = bytearray(calendar.count * row_bytes)
+    for offset in range(days):
+        flags = calendar.active(first + timedelta(days=offset))
+        byte, bit = divmod(offset, 8)
+        for service, running in enumerate(flags):
+            if running:
+                bits[service * row_bytes + byte] |= 1 << bit
+    meta = array("i", [first.toordinal() if first else 0, days, calendar.count, row_bytes])
+    return meta.tobytes(), bytes(bits)
+
+
+def compile_timetable(timetable: GtfsTimetable, path: Path) -> None:
+    """Write a timetable as a compiled file, replacing ``path`` atomically."""
+    sections: list[tuple[str, bytes]] = [(name, _ints(getattr(timetable, name))) for name in _INT_COLUMNS]
+    for name in _STRING_COLUMNS:
+        offsets, data = _strings(getattr(timetable, name))
+        sections += [(f"{name}.offsets", offsets), (f"{name}.data", data)]
+    # Headsigns repeat across thousands of trips, so trips point into a table of distinct ones
+    headsigns: dict[str, int] = {}
+    trip_headsign = array("i", (headsigns.setdefault(h, len(headsigns)) for h in timetable.trip_headsigns))
+    offsets, data = _strings(headsigns)
+    sections += [("headsigns.offsets", offsets), ("headsigns.data", data), ("trip_headsign", trip_headsign.tobytes())]
+    meta, bits = _calendar_bitmaps(timetable.calendar)
+    sections += [("calendar.meta", meta), ("calendar.bits", bits)]
+
+    position = _HEADER.size + _SECTION.size * len(sections)
+    table = []
+    for name, data in sections:
+        position = -(-position // _ALIGN) * _ALIGN
+        table.append((name, position, len(data)))
+        position += len(data)
+
+    partial = path.with_name(path.name + ".partial")
+    with partial.open("wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, _LITTLE, len(sections)))
+        for name, offset, length in table:
+            file.write(_SECTION.pack(name.encode(), offset, length))
+        for (_, offset, _), (_, data) in zip(table, sections):
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(data)
+    partial.replace(path)
+
+
+class MappedStrings:
+    """Read-only string column decoded from a mapped file on access."""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return str(self._data[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+
+class IndexedStrings:
+    """One string per row, looked up through an index into a table of distinct strings."""
+
+    def __init__(self, table: MappedStrings, index: memoryview):
+        self._table = table
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, row: int) -> str:
+        return self._table[self._index[row]]
+
+
+class BitmapCalendar:
+    """Service days read from the per-service bitmaps of a mapped file."""
+
+    def __init__(self, meta: memoryview, bits: memoryview):
+        self._first, self._days, self.count, self._row_bytes = meta
+        self._bits = bits
+        self._cache: dict[date, bytearray] = {}
+
+    def active(self, day: date) -> bytearray:
+        """Return one flag per service, set when it runs on ``day``."""
+        flags = self._cache.get(day)
+        if flags is not None:
+            return flags
+        flags = bytearray(self.count)
+        offset = day.toordinal() - self._first
+        if 0 <= offset < self._days:
+            byte, bit = divmod(offset, 8)
+            for service in range(self.count):
+                flags[service] = (self._bits[service * self._row_bytes + byte] >> bit) & 1
+        if len(self._cache) >= SERVICE_DAY_CACHE:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[day] = flags
+        return flags
+
+
+def open_timetable(path: Path) -> GtfsTimetable:
+    """Map a compiled timetable; its columns are views into the mapping."""
+    with path.open("rb") as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    _, _, _, count = _HEADER.unpack_from(view, 0)
+    sections = {}
+    for idx in range(count):
+        name, offset, length = _SECTION.unpack_from(view, _HEADER.size + idx * _SECTION.size)
+        sections[name.rstrip(b"\0").decode()] = view[offset:offset + length]
+
+    def ints(name: str) -> memoryview:
+        return sections[name].cast("i")
+
+    def strings(name: str) -> MappedStrings:
+        return MappedStrings(ints(f"{name}.offsets"), sections[f"{name}.data"])
+
+    # The views keep the mapping open for as long as the timetable is used
+    return GtfsTimetable(
+        strings("stop_names"),
+        ints("stop_area"),
+        strings("area_ids"),
+        ints("area_offsets"),
+        ints("area_rows"),
+        ints("trip_offsets"),
+        ints("trip_route"),
+        ints("trip_service"),
+        IndexedStrings(strings("headsigns"), ints("trip_headsign")),
+        strings("route_names"),
+        ints("st_trip"),
+        ints("st_stop"),
+        ints("st_arrival"),
+        ints("st_departure"),
+        BitmapCalendar(ints("calendar.meta"), sections["calendar.bits"]),
+    )
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile a GTFS static zip into a memory-mappable timetable.")
+    parser.add_argument("feed", type=Path)
+    parser.add_argument("output", type=Path, nargs="?")
+    args = parser.parse_args()
+    output = args.output or args.feed.with_name(args.feed.name + COMPILED_SUFFIX)
+    compile_timetable(GtfsTimetable.from_zip(args.feed), output)
+    print(f"Wrote {output} ({output.stat().st_size / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
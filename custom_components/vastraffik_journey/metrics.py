@@ -0,0 +1,113 @@
+"""Counters of API usage and latency for diagnostics."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from homeassistant.util.dt import utcnow
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def endpoint_name(path: str) -> str:
+    """Return the endpoint a request path is counted under."""
+    if path.endswith("/details"):
+        return "journey_details"
+    if path.endswith("/departures"):
+        return "departures"
+    return path.split("/", 1)[0]
+
+
+@dataclass
+class EndpointMetrics:
+    """Calls to one endpoint; the histogram has a last bucket for slower calls."""
+
+    calls: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    latency_total: float = 0.0
+    histogram: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    last_success: datetime | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        succeeded = self.calls - self.errors - self.rate_limited
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "mean_latency_ms": round(self.latency_total / succeeded, 1) if succeeded else None,
+            "latency_histogram_ms": {
+                **{f"<={bound}": count for bound, count in zip(LATENCY_BUCKETS, self.histogram)},
+                f">{LATENCY_BUCKETS[-1]}": self.histogram[-1],
+            },
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+        }
+
+
+class ApiMetrics:
+    """API usage of one client, recorded with a few integer updates per request."""
+
+    def __init__(self):
+        self.endpoints: dict[str, EndpointMetrics] = {}
+
+    def _endpoint(self, path: str) -> EndpointMetrics:
+        name = endpoint_name(path)
+        metrics = self.endpoints.get(name)
+        if metrics is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def record_success(self, path: str, latency_ms: float) -> None:
+        metrics = self._endpoint(path)
+        metrics.calls += 1
+        metrics.latency_total += latency_ms
+        metrics.histogram[bisect_left(LATENCY_BUCKETS, latency_ms)] += 1
+        metrics.last_success = utcnow()
+
+    def record_error(self, path: str, rate_limited: bool = False) -> None:
+        metrics = self._endpoint(path)
+        metrics.calls += 1
+        if rate_limited:
+            metrics.rate_limited += 1
+        else:
+            metrics.errors += 1
+
+    @property
+    def calls(self) -> int:
+        return sum(metrics.calls for metrics in self.endpoints.values())
+
+    @property
+    def failures(self) -> int:
+        return sum(metrics.errors + metrics.rate_limited for metrics in self.endpoints.values())
+
+    @property
+    def mean_latency_ms(self) -> float | None:
+        succeeded = sum(m.calls - m.errors - m.rate_limited for m in self.endpoints.values())
+        if not succeeded:
+            return None
+        return round(sum(m.latency_total for m in self.endpoints.values()) / succeeded, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {name: metrics.as_dict() for name, metrics in self.endpoints.items()}
+
+
+@dataclass
+class QueryMetrics:
+    """Refreshes of one coordinator query."""
+
+    fetches: int = 0
+    failures: int = 0
+    offline: int = 0  # answered from the GTFS feed without an API call
+    last_success: datetime | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "fetches": self.fetches,
+            "failures": self.failures,
+            "offline": self.offline,
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+        }
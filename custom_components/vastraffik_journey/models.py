@@ -0,0 +1,170 @@
+"""Compact journey representations for Vastraffik Journey sensors."""
+
+from __future__ import annotations
+
+import sys
+
+from homeassistant.util import dt as dt_util
+
+
+def _intern(value: str | None) -> str | None:
+    return sys.intern(value) if value else value
+
+
+def format_iso(timestamp: int | None) -> str | None:
+    """Render epoch seconds as a local ISO 8601 timestamp."""
+    if timestamp is None:
+        return None
+    return dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).isoformat()
+
+
+def format_clock(timestamp: int | None) -> str | None:
+    """Render epoch seconds as a local 'HH:MM' time."""
+    if timestamp is None:
+        return None
+    return dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).strftime("%H:%M")
+
+
+class Leg:
+    """One leg of a journey, stored as epoch seconds and interned strings.
+
+    Line, direction and stop names repeat across hundreds of journeys, so they
+    are interned; timestamps are only turned back into strings when a leg is
+    rendered.
+    """
+
+    __slots__ = (
+        "line",
+        "direction",
+        "origin",
+        "destination",
+        "planned_departure",
+        "estimated_departure",
+        "planned_arrival",
+        "estimated_arrival",
+        "cancelled",
+    )
+
+    def __init__(
+        self,
+        line: str | None,
+        direction: str | None,
+        origin: str | None,
+        destination: str | None,
+        planned_departure: int | None,
+        estimated_departure: int | None,
+        planned_arrival: int | None,
+        estimated_arrival: int | None,
+        cancelled: bool = False,
+    ):
+        self.line = _intern(line)
+        self.direction = _intern(direction)
+        self.origin = _intern(origin)
+        self.destination = _intern(destination)
+        self.planned_departure = planned_departure
+        self.estimated_departure = estimated_departure
+        self.planned_arrival = planned_arrival
+        self.estimated_arrival = estimated_arrival
+        self.cancelled = cancelled
+
+    @property
+    def departure(self) -> int | None:
+        """Return the estimated, or else planned, departure time."""
+        return self.estimated_departure if self.estimated_departure is not None else self.planned_departure
+
+    @property
+    def deviates(self) -> bool:
+        """Return True if realtime data moved the departure."""
+        return self.estimated_departure is not None and self.estimated_departure != self.planned_departure
+
+    def connection(self, idx: int) -> str:
+        """Render the leg the way the ``connections`` attribute lists it."""
+        return (
+            f"{idx}. {self.line or '?'} from {self.origin or '?'} to {self.destination or '?'}"
+            f" ({format_clock(self.planned_departure)} → {format_clock(self.planned_arrival)})"
+        )
+
+
+class Journey:
+    """One journey of a trip or journey list search.
+
+    ``main_leg`` is the first leg served by a line, or the first leg of a
+    journey that is walked entirely.
+    """
+
+    __slots__ = ("reference", "legs", "main_leg")
+
+    def __init__(self, reference: str | None, legs: tuple[Leg, ...]):
+        self.reference = reference
+        self.legs = legs
+        self.main_leg = next((leg for leg in legs if leg.line is not None), legs[0])
+
+    @property
+    def departure(self) -> int | None:
+        return self.main_leg.departure
+
+    @property
+    def final_arrival(self) -> int | None:
+        return self.legs[-1].planned_arrival
+
+    @property
+    def cancelled(self) -> bool:
+        return any(leg.cancelled for leg in self.legs)
+
+    def connections(self) -> str:
+        """Render every leg, one per line."""
+        return "\n".join(leg.connection(idx) for idx, leg in enumerate(self.legs, 1))
+
+    def as_dict(self) -> dict[str, str | None]:
+        """Render the journey the way the ``journeys`` attribute shows it."""
+        leg = self.main_leg
+        return {
+            "departure": format_iso(leg.planned_departure),
+            "arrival": format_iso(leg.planned_arrival),
+            "line": leg.line,
+            "direction": leg.direction,
+        }
+
+
+class Departure:
+    """One departure of a stop area's departure board."""
+
+    __slots__ = ("reference", "line", "direction", "track", "planned", "estimated", "cancelled")
+
+    def __init__(
+        self,
+        reference: str | None,
+        line: str | None,
+        direction: str | None,
+        track: str | None,
+        planned: int | None,
+        estimated: int | None,
+        cancelled: bool = False,
+    ):
+        self.reference = reference
+        self.line = _intern(line)
+        self.direction = _intern(direction)
+        self.track = _intern(track)
+        self.planned = planned
+        self.estimated = estimated
+        self.cancelled = cancelled
+
+    @property
+    def departure(self) -> int | None:
+        """Return the estimated, or else planned, departure time."""
+        return self.estimated if self.estimated is not None else self.planned
+
+    @property
+    def deviates(self) -> bool:
+        """Return True if realtime data moved the departure."""
+        return self.estimated is not None and self.estimated != self.planned
+
+    def as_dict(self) -> dict[str, str | None]:
+        """Render the departure the way the ``departures`` attribute shows it."""
+        return {
+            "departure": format_clock(self.planned),
+            "estimated": format_clock(self.estimated),
+            "line": self.line,
+            "direction": self.direction,
+            "track": self.track,
+        }
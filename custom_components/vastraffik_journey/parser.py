@@ -0,0 +1,85 @@
+"""Decode Travel Planner journey and departure responses into the journey model."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from .models import Departure, Journey, Leg
+
+
+def parse_time(value: str | None) -> int | None:
+    """Return an RFC 3339 timestamp as epoch seconds."""
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except ValueError:
+        return None
+
+
+def _stop_name(endpoint: Any) -> str | None:
+    if not isinstance(endpoint, dict):
+        return str(endpoint) if endpoint else None
+    name = endpoint.get("name")
+    if name is None:
+        name = (endpoint.get("stopPoint") or {}).get("name")
+    return name
+
+
+def parse_leg(raw: dict) -> Leg:
+    """Decode the fields of a trip leg the sensors use."""
+    service_journey = raw.get("serviceJourney")
+    if service_journey:
+        line = service_journey.get("line") or {}
+        line_name = line.get("shortName") or line.get("name")
+        direction = service_journey.get("direction")
+    else:
+        line_name = direction = None
+    return Leg(
+        line_name,
+        direction,
+        _stop_name(raw.get("origin") or raw.get("from")),
+        _stop_name(raw.get("destination") or raw.get("to")),
+        parse_time(raw.get("plannedDepartureTime")),
+        parse_time(raw.get("estimatedDepartureTime")),
+        parse_time(raw.get("plannedArrivalTime")),
+        parse_time(raw.get("estimatedArrivalTime")),
+        bool(raw.get("isCancelled")),
+    )
+
+
+def parse_journey(raw: dict) -> Journey | None:
+    """Decode a journey, or return None if it has no trip legs."""
+    legs = raw.get("tripLegs")
+    if not legs:
+        return None
+    return Journey(raw.get("detailsReference"), tuple(parse_leg(leg) for leg in legs))
+
+
+def parse_journeys(results: list[dict] | None) -> list[Journey]:
+    """Decode the ``results`` of a journeys response."""
+    return [journey for journey in map(parse_journey, results or ()) if journey is not None]
+
+
+def parse_departure(raw: dict) -> Departure:
+    """Decode a departure board entry."""
+    service_journey = raw.get("serviceJourney") or {}
+    line = service_journey.get("line") or {}
+    stop_point = raw.get("stopPoint") or {}
+    return Departure(
+        raw.get("detailsReference"),
+        line.get("shortName") or line.get("name"),
+        service_journey.get("direction"),
+        stop_point.get("platform"),
+        parse_time(raw.get("plannedTime")),
+        parse_time(raw.get("estimatedTime")),
+        bool(raw.get("isCancelled")),
+    )
+
+
+def parse_departures(results: list[dict] | None) -> list[Departure]:
+    """Decode the ``results`` of a stop area departures response, soonest first."""
+    departures = [parse_departure(raw) for raw in results or ()]
+    departures.sort(key=lambda departure: departure.departure or 0)
+    return departures
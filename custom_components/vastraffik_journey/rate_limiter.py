@@ -0,0 +1,97 @@
+"""Token bucket rate limiter with priority classes, shared by all entries."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+
+from homeassistant.core import HomeAssistant, callback
+
+from .util import domain_singleton
+
+DATA_RATE_LIMITER = "rate_limiter"
+
+# Lower values are served first
+PRIORITY_REALTIME = 0  # next-departure sensors
+PRIORITY_BULK = 1  # journey list sweeps
+PRIORITY_LOOKUP = 2  # stop lookups and config flow autocomplete
+
+DEFAULT_RATE = 5.0  # requests per second
+DEFAULT_BURST = 10
+
+
+@callback
+def async_get_rate_limiter(hass: HomeAssistant) -> RateLimiter:
+    """Return the rate limiter every API client queues on."""
+    return domain_singleton(hass, DATA_RATE_LIMITER, RateLimiter)
+
+
+class RateLimiter:
+    """Token bucket that queues callers instead of failing them.
+
+    Waiters are woken strictly in (priority, arrival) order, so a burst of
+    journey list requests can never hold back a next-departure refresh that
+    arrives later.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if now < self._blocked_until:
+            self._updated = now
+            return
+        self._tokens = min(self.burst, self._tokens + (now - max(self._updated, self._blocked_until)) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: int = PRIORITY_BULK) -> None:
+        """Wait until a request of the given priority may be sent."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._schedule()
+        await future
+
+    def penalize(self, retry_after: float) -> None:
+        """Stop handing out tokens for a while, e.g. after an HTTP 429."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        self._tokens = 0.0
+        self._schedule()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _schedule(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._wake()
+
+    def _wake(self) -> None:
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # Cancelled while waiting
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        if self._waiters:
+            now = time.monotonic()
+            delay = max(self._blocked_until - now, 0) + (1 - self._tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self._wake)
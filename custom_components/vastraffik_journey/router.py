@@ -0,0 +1,186 @@
+"""Round-based journey planning with transfers over a local GTFS timetable.
+
+This is RAPTOR (Delling et al., "Round-Based Public Transit Routing") at
+stop area level. Round ``k`` finds the earliest arrival at every stop area
+reachable with ``k`` vehicles: it collects the trips departing from the
+areas improved in the previous round, rides each trip once from its
+earliest boarding and marks the areas it improves. Transfers are changes
+within a stop area (the timetable has no footpaths between areas).
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta, tzinfo
+import logging
+
+from .gtfs import MAX_SCAN, GtfsTimetable
+from .models import Journey
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_TRANSFERS = 3
+# Seconds to change vehicles within a stop area
+MIN_TRANSFER = 120
+# Departures further than this after reaching a stop area are not considered
+MAX_WAIT = 3600
+# Earliest arrival of a window query journey before the window's start
+ARRIVAL_LOOKBACK = timedelta(hours=3)
+# Journeys departing later than this after the requested time are not searched
+HORIZON = timedelta(hours=24)
+
+_UNREACHED = float("inf")
+
+
+class JourneyRouter:
+    """Plan journeys the way the Travel Planner would, from the timetable alone."""
+
+    def __init__(self, timetable: GtfsTimetable):
+        self.timetable = timetable
+
+    def knows(self, *gids: str) -> bool:
+        """Return True if the timetable has every one of the stop areas."""
+        return all(self.timetable.area(gid) is not None for gid in gids)
+
+    def journeys(
+        self,
+        origin_gid: str,
+        dest_gid: str,
+        after: datetime,
+        lines=None,
+        limit: int = 10,
+        until: int | None = None,
+    ) -> list[Journey]:
+        """Return journeys departing from ``after`` on, in departure order.
+
+        A journey is left out when one departing later arrives no later. The
+        first vehicle has to be one of ``lines``, when given. ``until`` stops
+        the search at journeys departing after that epoch second, and the
+        search never goes further than HORIZON.
+        """
+        origin = self.timetable.area(origin_gid)
+        dest = self.timetable.area(dest_gid)
+        if origin is None or dest is None or origin == dest:
+            return []
+        zone = after.tzinfo
+        horizon = int((after + HORIZON).timestamp())
+        until = horizon if until is None else min(until, horizon)
+        journeys: list[Journey] = []
+        journey = self._earliest(origin, dest, int(after.timestamp()), zone, lines)
+        while journey is not None and len(journeys) < limit:
+            if journey.departure > until:
+                break
+            later = self._earliest(origin, dest, journey.departure + 1, zone, lines)
+            if later is None or later.final_arrival > journey.final_arrival:
+                journeys.append(journey)
+            journey = later
+        return journeys
+
+    def journeys_between(
+        self,
+        origin_gid: str,
+        dest_gid: str,
+        start: datetime,
+        end: datetime,
+        time_relates_to: str = "departure",
+        lines=None,
+    ) -> list[Journey]:
+        """Return every journey of a time window, for journey list sensors."""
+        until = int(end.timestamp())
+        if time_relates_to == "arrival":
+            # Arrivals grow with departures, since dominated journeys are left out, and
+            # nothing departing after the window's end arrives within it
+            journeys = self.journeys(
+                origin_gid, dest_gid, start - ARRIVAL_LOOKBACK, lines=lines, limit=MAX_SCAN, until=until
+            )
+            return [j for j in journeys if start.timestamp() <= j.final_arrival <= until]
+        return self.journeys(origin_gid, dest_gid, start, lines=lines, limit=MAX_SCAN, until=until)
+
+    def _earliest(self, origin: int, dest: int, start: int, zone: tzinfo | None, lines) -> Journey | None:
+        """Return the earliest arriving journey departing from ``start`` on, with the fewest transfers."""
+        t = self.timetable
+        arrivals, stops, areas = t.st_arrival, t.st_stop, t.stop_area
+        service_days: dict[date, tuple[int, bytearray]] = {}
+        best: dict[int, int] = {origin: start}
+        marked = {origin: start}
+        # rounds[k][area] = (trip, midnight, boarding row, alighting row) of the k-th vehicle
+        rounds: list[dict[int, tuple[int, int, int, int]]] = [{}]
+        target = _UNREACHED
+        # Waits at the origin count from its next departure, so a night without service is skipped
+        boardings: dict[tuple[int, int], int] = {}
+        self._collect(origin, start, _UNREACHED, zone, service_days, lines, boardings, first_only=True)
+        if not boardings:
+            return None
+        first = min(midnight + t.st_departure[row] for (_, midnight), row in boardings.items())
+        for k in range(1, MAX_TRANSFERS + 2):
+            boardings = {}
+            for area, arrival in marked.items():
+                if k == 1:
+                    self._collect(area, start, first + MAX_WAIT, zone, service_days, lines, boardings)
+                else:
+                    ready = arrival + MIN_TRANSFER
+                    self._collect(area, ready, min(target, ready + MAX_WAIT), zone, service_days, None, boardings)
+            labels = {}
+            for (trip, midnight), board in boardings.items():
+                for row in range(board + 1, t.trip_offsets[trip + 1]):
+                    arrival = midnight + arrivals[row]
+                    if arrival >= target:
+                        break
+                    area = areas[stops[row]]
+                    if arrival < best.get(area, _UNREACHED):
+                        best[area] = arrival
+                        labels[area] = (trip, midnight, board, row)
+                        if area == dest:
+                            target = arrival
+            rounds.append(labels)
+            marked = {area: best[area] for area in labels if area != dest}
+            if not marked:
+                break
+        if target is _UNREACHED:
+            return None
+        # Only strict improvements are labelled, so the last round reaching the destination set ``target``
+        k = max(k for k, labels in enumerate(rounds) if dest in labels)
+        legs = []
+        area = dest
+        for labels in reversed(rounds[1:k + 1]):
+            trip, midnight, board, alight = labels[area]
+            legs.append(t.leg(trip, board, alight, midnight))
+            area = areas[stops[board]]
+        return Journey(None, tuple(reversed(legs)))
+
+    def _collect(self, area, ready, until, zone, service_days, lines, boardings, first_only=False) -> None:
+        """Add the earliest boarding row of every trip leaving ``area`` between ``ready`` and ``until``.
+
+        With ``first_only``, stop at the first trip of each service day.
+        """
+        t = self.timetable
+        departures = t.st_departure
+        first, last = t.area_offsets[area], t.area_offsets[area + 1]
+        day = datetime.fromtimestamp(ready, zone).date()
+        # GTFS times of trips running past midnight continue beyond 24:00:00
+        for service_day in (day - timedelta(days=1), day, day + timedelta(days=1)):
+            midnight, active = self._service_day(service_day, zone, service_days)
+            if until <= midnight:
+                continue
+            start = bisect_left(t.area_rows, ready - midnight, first, last, key=departures.__getitem__)
+            for pos in range(start, min(last, start + MAX_SCAN)):
+                row = t.area_rows[pos]
+                if midnight + departures[row] >= until:
+                    break
+                trip = t.st_trip[row]
+                if not active[t.trip_service[trip]]:
+                    continue
+                if lines and t.route_names[t.trip_route[trip]] not in lines:
+                    continue
+                key = (trip, midnight)
+                if row < boardings.get(key, row + 1):
+                    boardings[key] = row
+                if first_only:
+                    break
+
+    def _service_day(self, day: date, zone, service_days) -> tuple[int, bytearray]:
+        known = service_days.get(day)
+        if known is None:
+            midnight = int(datetime.combine(day, time(), tzinfo=zone).timestamp())
+            known = service_days[day] = (midnight, self.timetable.calendar.active(day))
+        return known
@@ -2,25 +2,51 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 import hashlib
+from itertools import islice
 import logging
+from typing import Any, Callable, NamedTuple
 
-from vasttrafik import JournyPlanner, Error
 import voluptuous as vol
 
 from homeassistant.components.sensor import (
     PLATFORM_SCHEMA as SENSOR_PLATFORM_SCHEMA,
+    SensorDeviceClass,
     SensorEntity,
+    SensorStateClass,
 )
-from homeassistant.const import CONF_DELAY, CONF_NAME
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import config_validation as cv
+from homeassistant.const import CONF_DELAY, CONF_NAME, PERCENTAGE, UnitOfTime
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-from homeassistant.util import Throttle
-from homeassistant.util.dt import now
-from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.entity_registry import (
+    async_entries_for_config_entry,
+    async_get as async_get_entity_registry,
+)
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.util.dt import now, utc_from_timestamp
+
+from .api import async_get_client
+from .const import DOMAIN
+from .coordinator import (
+    BoardQuery,
+    DEFAULT_LIST_CONCURRENCY,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    TripQuery,
+    VasttrafikTripCoordinator,
+    WindowQuery,
+    adaptive_poll_interval,
+)
+from .entity_index import SIGNAL_PAUSE_CHANGED, async_get_entity_index
+from .models import Departure, Journey, format_clock, format_iso
+from .trip_cache import DEFAULT_BUCKET
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,6 +57,7 @@ ATTR_TRACK = "track"
 ATTR_FROM = "from"
 ATTR_TO = "to"
 ATTR_DELAY = "delay"
+ATTR_STALE_SINCE = "stale_since"
 
 CONF_DEPARTURES = "departures"
 CONF_FROM = "from"
@@ -42,10 +69,104 @@ CONF_SECRET = "secret"
 CONF_LIST_START_TIME = "list_start_time"
 CONF_LIST_END_TIME = "list_end_time"
 CONF_LIST_TIME_RELATES_TO = "list_time_relates_to"  # 'departure' or 'arrival'
+CONF_LIST_CONCURRENCY = "list_concurrency"
+CONF_TRIP_CACHE_BUCKET = "trip_cache_bucket"  # seconds
+CONF_MIN_POLL_INTERVAL = "min_poll_interval"  # seconds
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"  # seconds
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors"
+CONF_GTFS_PATH = "gtfs_path"  # GTFS static zip, relative to the config directory
+CONF_DEPARTURE_BOARDS = "departure_boards"
+CONF_DESTINATIONS = "destinations"
 
 DEFAULT_DELAY = 0
 
+# The journeys attribute only shows this many journeys, get_journeys returns all of them
+MAX_JOURNEYS_ATTRIBUTE = 20
+SERVICE_GET_JOURNEYS = "get_journeys"
+
 MIN_TIME_BETWEEN_UPDATES = timedelta(seconds=120)
+# Poll faster for this long after a realtime deviation was seen
+DEVIATION_MEMORY = timedelta(minutes=15)
+# Upcoming journeys a journey sensor keeps to rotate through without API calls
+LOOKAHEAD_JOURNEYS = 5
+
+
+class DiagnosticSensorDescription(NamedTuple):
+    """A diagnostic sensor reading API usage off the coordinator."""
+
+    key: str
+    name: str
+    value_fn: Callable[[VasttrafikTripCoordinator], Any]
+    unit: str | None = None
+    device_class: SensorDeviceClass | None = None
+    state_class: SensorStateClass | None = None
+    attributes_fn: Callable[[VasttrafikTripCoordinator], dict] | None = None
+
+
+def _trip_cache_hit_rate(coordinator):
+    hit_rate = coordinator.trip_cache.stats()["hit_rate"]
+    return round(hit_rate * 100, 1) if hit_rate is not None else None
+
+
+DIAGNOSTIC_SENSORS = (
+    DiagnosticSensorDescription(
+        "api_calls",
+        "API calls",
+        lambda coordinator: coordinator.client.metrics.calls,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        attributes_fn=lambda coordinator: {
+            name: metrics.calls for name, metrics in coordinator.client.metrics.endpoints.items()
+        },
+    ),
+    DiagnosticSensorDescription(
+        "api_failures",
+        "API failures",
+        lambda coordinator: coordinator.client.metrics.failures,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        attributes_fn=lambda coordinator: {
+            "rate_limited": sum(m.rate_limited for m in coordinator.client.metrics.endpoints.values()),
+            "token_renewals": coordinator.client.token_renewals,
+        },
+    ),
+    DiagnosticSensorDescription(
+        "api_latency",
+        "API latency",
+        lambda coordinator: coordinator.client.metrics.mean_latency_ms,
+        unit=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    DiagnosticSensorDescription(
+        "trip_cache_hit_rate",
+        "Trip cache hit rate",
+        _trip_cache_hit_rate,
+        unit=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    DiagnosticSensorDescription(
+        "last_refresh",
+        "Last refresh",
+        lambda coordinator: coordinator.last_refresh,
+        device_class=SensorDeviceClass.TIMESTAMP,
+    ),
+)
+
+
+def _valid_destinations(destinations):
+    """Require every destination of a board to have its own name, heading or lines.
+
+    The label is part of the destination sensor's unique ID.
+    """
+    labels = set()
+    for destination in destinations:
+        label = destination_label(destination)
+        if not label:
+            raise vol.Invalid("a destination needs a name, a heading or lines")
+        if label in labels:
+            raise vol.Invalid(f"destination {label} is given twice")
+        labels.add(label)
+    return destinations
+
 
 PLATFORM_SCHEMA = SENSOR_PLATFORM_SCHEMA.extend(
     {
@@ -79,6 +200,30 @@ PLATFORM_SCHEMA = SENSOR_PLATFORM_SCHEMA.extend(
                 }
             ]
         ),
+        vol.Optional(CONF_DEPARTURE_BOARDS, default=[]): vol.All(
+            [
+                {
+                    vol.Required(CONF_FROM): cv.string,
+                    vol.Optional(CONF_NAME): cv.string,
+                    vol.Required(CONF_DESTINATIONS): vol.All(
+                        cv.ensure_list,
+                        [
+                            {
+                                vol.Optional(CONF_NAME): cv.string,
+                                vol.Optional(CONF_HEADING): cv.string,
+                                vol.Optional(CONF_LINES, default=[]): vol.All(cv.ensure_list, [cv.string]),
+                            }
+                        ],
+                        _valid_destinations,
+                    ),
+                }
+            ]
+        ),
+        vol.Optional(CONF_LIST_CONCURRENCY, default=DEFAULT_LIST_CONCURRENCY): cv.positive_int,
+        vol.Optional(CONF_TRIP_CACHE_BUCKET, default=DEFAULT_BUCKET): cv.positive_int,
+        vol.Optional(CONF_MIN_POLL_INTERVAL, default=DEFAULT_MIN_POLL_INTERVAL): cv.positive_int,
+        vol.Optional(CONF_MAX_POLL_INTERVAL, default=DEFAULT_MAX_POLL_INTERVAL): cv.positive_int,
+        vol.Optional(CONF_GTFS_PATH): cv.string,
     }
 )
 
@@ -90,11 +235,24 @@ async def async_setup_platform(
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up the journey sensor from YAML."""
-    planner = JournyPlanner(config.get(CONF_CLIENT_ID), config.get(CONF_SECRET))
+    client = async_get_client(hass, config.get(CONF_CLIENT_ID), config.get(CONF_SECRET))
+    coordinator = VasttrafikTripCoordinator(
+        hass,
+        client,
+        update_interval=MIN_TIME_BETWEEN_UPDATES,
+        list_concurrency=config.get(CONF_LIST_CONCURRENCY, DEFAULT_LIST_CONCURRENCY),
+        trip_cache_bucket=config.get(CONF_TRIP_CACHE_BUCKET, DEFAULT_BUCKET),
+        min_poll_interval=config.get(CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL),
+        max_poll_interval=config.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL),
+        gtfs_path=config.get(CONF_GTFS_PATH),
+    )
+    journey_list_sensors = config.get("journey_list_sensors", [])
+    departure_boards = config.get(CONF_DEPARTURE_BOARDS, [])
+    coordinator.async_add_locations(_config_locations(config[CONF_DEPARTURES], journey_list_sensors, departure_boards))
     sensors = []
     for idx, departure in enumerate(config[CONF_DEPARTURES]):
         sensor = VasttrafikJourneySensor(
-            planner,
+            coordinator,
             departure.get(CONF_NAME),
             departure.get(CONF_FROM),
             departure.get(CONF_DESTINATION),
@@ -105,10 +263,9 @@ async def async_setup_platform(
         )
         sensors.append(sensor)
     # Add journey list sensors
-    journey_list_sensors = config.get("journey_list_sensors", [])
     for idx, sensor_conf in enumerate(journey_list_sensors):
         sensor = VasttrafikJourneyListSensor(
-            planner,
+            coordinator,
             sensor_conf.get(CONF_NAME),
             sensor_conf.get(CONF_FROM),
             sensor_conf.get(CONF_DESTINATION),
@@ -119,7 +276,9 @@ async def async_setup_platform(
             index=idx,
         )
         sensors.append(sensor)
-    async_add_entities(sensors, True)
+    sensors.extend(_board_sensors(coordinator, departure_boards))
+    _async_register_services()
+    _async_add_coordinated_entities(hass, coordinator, sensors, async_add_entities)
 
 
 def setup_platform(
@@ -140,16 +299,14 @@ async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities: AddE
     options = entry.options
     departures = options.get(CONF_DEPARTURES)
     journey_list_sensors = options.get("journey_list_sensors", [])
+    departure_boards = options.get(CONF_DEPARTURE_BOARDS, [])
     if departures is None:
-        departures = data.get(CONF_DEPARTURES)
-    if not departures:
+        departures = data.get(CONF_DEPARTURES) or []
+    if not departures and not departure_boards:
         _LOGGER.info("No departures found in config entry data or options: %s", {**data, **options})
         return
 
     # --- Remove orphaned sensors and switches for both journey and list sensors ---
-    entity_registry = async_get_entity_registry(hass)  # Remove await, this is a synchronous function
-    sensor_domain = "sensor"
-    switch_domain = "switch"
     # Collect all valid unique_ids for journey and list sensors
     current_sensor_unique_ids = set()
     current_switch_unique_ids = set()
@@ -161,60 +318,148 @@ async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities: AddE
         # List sensor unique_id format must match VasttrafikJourneyListSensor
         uid = f"journeylist_{ls.get('from')}_{ls.get('destination')}_{ls.get('list_start_time')}_{ls.get('list_end_time')}_{ls.get('list_time_relates_to', 'departure')}_{idx}"
         current_sensor_unique_ids.add(uid)
-    # Remove orphaned sensors and their linked pause switches
-    for entity in list(entity_registry.entities.values()):
-        # Remove orphaned sensors
-        if entity.domain == sensor_domain and entity.config_entry_id == entry.entry_id:
-            if entity.unique_id not in current_sensor_unique_ids:
-                _LOGGER.info(f"Removing orphaned sensor entity: {entity.entity_id} (unique_id={entity.unique_id})")
-                entity_registry.async_remove(entity.entity_id)
-                # Also remove linked pause switch if it exists
-                pause_switch_unique_id = f"pause_{entity.unique_id}"
-                for sw_entity in list(entity_registry.entities.values()):
-                    if sw_entity.domain == switch_domain and sw_entity.unique_id == pause_switch_unique_id:
-                        _LOGGER.info(f"Removing orphaned pause switch: {sw_entity.entity_id} (unique_id={sw_entity.unique_id})")
-                        entity_registry.async_remove(sw_entity.entity_id)
-        # Remove orphaned pause switches (if their linked sensor is gone)
-        if entity.domain == switch_domain and entity.config_entry_id == entry.entry_id:
-            linked_sensor_unique_id = entity.unique_id.replace("pause_", "", 1)
-            if linked_sensor_unique_id not in current_sensor_unique_ids:
-                _LOGGER.info(f"Removing orphaned pause switch (no linked sensor): {entity.entity_id} (unique_id={entity.unique_id})")
-                entity_registry.async_remove(entity.entity_id)
-
-    def create_sensors():
-        planner = JournyPlanner(data[CONF_CLIENT_ID], data[CONF_SECRET])
-        sensors = []
-        for idx, departure in enumerate(departures):
-            sensor = VasttrafikJourneySensor(
-                planner,
-                departure.get(CONF_NAME),
-                departure.get(CONF_FROM),
-                departure.get(CONF_DESTINATION),
-                departure.get(CONF_LINES),
-                departure.get(CONF_DELAY),
-                departure.get("pause_entity_id"),
-                index=idx,  # Pass index to sensor
-            )
-            sensors.append(sensor)
-        for idx, ls in enumerate(journey_list_sensors):
-            sensor = VasttrafikJourneyListSensor(
-                planner,
-                ls.get(CONF_NAME),
-                ls.get(CONF_FROM),
-                ls.get(CONF_DESTINATION),
-                ls.get(CONF_LINES),
-                ls.get(CONF_LIST_START_TIME),
-                ls.get(CONF_LIST_END_TIME),
-                ls.get(CONF_LIST_TIME_RELATES_TO, "departure"),
-                index=idx,
+    for idx, board_conf in enumerate(departure_boards):
+        board_uid = board_unique_id(board_conf.get(CONF_FROM), idx)
+        current_sensor_unique_ids.add(board_uid)
+        current_sensor_unique_ids.update(
+            f"{board_uid}_{destination_label(destination)}" for destination in board_conf.get(CONF_DESTINATIONS) or []
+        )
+    if options.get(CONF_DIAGNOSTIC_SENSORS):
+        current_sensor_unique_ids.update(f"{entry.entry_id}_{desc.key}" for desc in DIAGNOSTIC_SENSORS)
+    _async_remove_orphaned_entities(hass, entry, current_sensor_unique_ids, current_switch_unique_ids)
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.async_add_locations(_config_locations(departures, journey_list_sensors, departure_boards))
+
+    sensors = []
+    for idx, departure in enumerate(departures):
+        sensor = VasttrafikJourneySensor(
+            coordinator,
+            departure.get(CONF_NAME),
+            departure.get(CONF_FROM),
+            departure.get(CONF_DESTINATION),
+            departure.get(CONF_LINES),
+            departure.get(CONF_DELAY),
+            departure.get("pause_entity_id"),
+            index=idx,  # Pass index to sensor
+        )
+        sensors.append(sensor)
+    for idx, ls in enumerate(journey_list_sensors):
+        sensor = VasttrafikJourneyListSensor(
+            coordinator,
+            ls.get(CONF_NAME),
+            ls.get(CONF_FROM),
+            ls.get(CONF_DESTINATION),
+            ls.get(CONF_LINES),
+            ls.get(CONF_LIST_START_TIME),
+            ls.get(CONF_LIST_END_TIME),
+            ls.get(CONF_LIST_TIME_RELATES_TO, "departure"),
+            index=idx,
+        )
+        sensors.append(sensor)
+    sensors.extend(_board_sensors(coordinator, departure_boards))
+
+    _async_register_services()
+    _async_add_coordinated_entities(hass, coordinator, sensors, async_add_entities)
+    if options.get(CONF_DIAGNOSTIC_SENSORS):
+        async_add_entities(
+            VasttrafikDiagnosticSensor(coordinator, entry.entry_id, description) for description in DIAGNOSTIC_SENSORS
+        )
+
+
+@callback
+def _async_remove_orphaned_entities(hass, entry, sensor_unique_ids, switch_unique_ids):
+    """Remove registry entries of this entry whose sensor or pause switch is no longer configured.
+
+    Only the entry's own registry entries are read, and each is checked
+    against the configured unique_id sets once. A pause switch goes with
+    its sensor, since switches only exist for configured journey sensors.
+    """
+    entity_registry = async_get_entity_registry(hass)
+    expected = {"sensor": sensor_unique_ids, "switch": switch_unique_ids}
+    orphans = [
+        entity
+        for entity in async_entries_for_config_entry(entity_registry, entry.entry_id)
+        if entity.domain in expected and entity.unique_id not in expected[entity.domain]
+    ]
+    for entity in orphans:
+        _LOGGER.info("Removing orphaned %s entity: %s (unique_id=%s)", entity.domain, entity.entity_id, entity.unique_id)
+        entity_registry.async_remove(entity.entity_id)
+
+
+async def _async_get_journeys(entity, call: ServiceCall):
+    """Answer get_journeys, which only journey list sensors support."""
+    if not isinstance(entity, VasttrafikJourneyListSensor):
+        raise ServiceValidationError(f"{entity.entity_id} is not a journey list sensor")
+    return await entity.async_get_journeys()
+
+
+@callback
+def _async_register_services():
+    """Register the entity services of this platform."""
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_GET_JOURNEYS,
+        {},
+        _async_get_journeys,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+@callback
+def _async_add_coordinated_entities(hass, coordinator, sensors, async_add_entities):
+    """Add sensors right away and resolve stations and fetch their queries in the background."""
+    for sensor in sensors:
+        coordinator.async_subscribe(sensor)
+    async_add_entities(sensors)
+    hass.async_create_background_task(coordinator.async_refresh(), f"{coordinator.name} first refresh")
+
+
+def _config_locations(departures, journey_list_sensors, departure_boards=()):
+    """Return every distinct origin and destination used by the sensors."""
+    locations = {}
+    for conf in [*departures, *journey_list_sensors]:
+        locations[conf.get(CONF_FROM)] = None
+        locations[conf.get(CONF_DESTINATION)] = None
+    for conf in departure_boards:
+        locations[conf.get(CONF_FROM)] = None
+    return list(locations)
+
+
+def _board_sensors(coordinator, departure_boards):
+    """Return each departure board sensor followed by its destination sensors."""
+    sensors = []
+    for idx, board_conf in enumerate(departure_boards):
+        board = VasttrafikDepartureBoardSensor(coordinator, board_conf.get(CONF_NAME), board_conf.get(CONF_FROM), index=idx)
+        sensors.append(board)
+        for destination in board_conf.get(CONF_DESTINATIONS) or []:
+            sensors.append(
+                VasttrafikBoardDestinationSensor(
+                    coordinator,
+                    board,
+                    destination_label(destination),
+                    destination.get(CONF_HEADING),
+                    destination.get(CONF_LINES),
+                )
             )
-            sensors.append(sensor)
-        return sensors
+    return sensors
+
+
+def board_unique_id(origin, idx):
+    return f"board_{origin}_{idx}"
+
 
-    sensors = await hass.async_add_executor_job(create_sensors)
-    async_add_entities(sensors, True)
-    # Store sensors in hass.data for switch platform
-    hass.data.setdefault("vastraffik_journey_sensors", []).extend(sensors)
+def destination_label(destination):
+    """Return the name of a departure board destination, from its heading or lines if unnamed."""
+    return destination.get(CONF_NAME) or destination.get(CONF_HEADING) or ", ".join(destination.get(CONF_LINES) or [])
+
+
+def _with_staleness(coordinator, query, attributes):
+    """Add when the query's results went stale, while the API fails and its last results are shown."""
+    stale_since = coordinator.stale_since(query)
+    if stale_since is not None:
+        attributes[ATTR_STALE_SINCE] = stale_since.isoformat()
+    return attributes
 
 
 def build_sensor_unique_id(dep, idx):
@@ -228,15 +473,15 @@ def build_sensor_unique_id(dep, idx):
     return hashlib.md5(unique.encode()).hexdigest()
 
 
-class VasttrafikJourneySensor(SensorEntity):
+class VasttrafikJourneySensor(CoordinatorEntity, SensorEntity):
     """Implementation of a Vasttrafik Journey Sensor."""
 
     _attr_attribution = "Data provided by Västtrafik"
     _attr_icon = "mdi:train"
 
-    def __init__(self, planner, name, origin, destination, lines, delay, pause_entity_id=None, index=None):
+    def __init__(self, coordinator, name, origin, destination, lines, delay, pause_entity_id=None, index=None):
         """Initialize the sensor."""
-        self._planner = planner
+        super().__init__(coordinator)
         # Use index-based name if no custom name is provided
         if name:
             self._name = name
@@ -244,8 +489,8 @@ class VasttrafikJourneySensor(SensorEntity):
             self._name = f"Journey {index + 1}"
         else:
             self._name = f"{origin} to {destination}"
-        self._origin = self.get_station_id(origin)
-        self._destination = self.get_station_id(destination)
+        self._origin = origin
+        self._destination = destination
         self._lines = lines if lines else None
         self._delay = timedelta(minutes=delay)
         self._journeys = None
@@ -253,7 +498,9 @@ class VasttrafikJourneySensor(SensorEntity):
         self._attributes = None
         self._pause_entity_id = pause_entity_id
         self._paused = False  # Internal pause state
-        self.hass = None  # Will be set in async_added_to_hass
+        self._last_deviation = None  # When a realtime deviation was last seen
+        self._queue: list[Journey] = []  # Upcoming journeys, soonest first
+        self._unsub_advance = None
         # Use the helper for unique_id
         dep = {
             "from": origin,
@@ -263,18 +510,39 @@ class VasttrafikJourneySensor(SensorEntity):
         self._attr_unique_id = build_sensor_unique_id(dep, index)
 
     async def async_added_to_hass(self):
-        self.hass = self._hass if hasattr(self, '_hass') else getattr(self, 'hass', None) or self.hass
-        if self.hass is None:
-            self.hass = self._hass = getattr(self, 'hass', None)
-
-    def get_station_id(self, location):
-        """Get the station ID."""
-        if location.isdecimal():
-            station_info = {"station_name": location, "station_id": location}
-        else:
-            station_id = self._planner.location_name(location)[0]["gid"]
-            station_info = {"station_name": location, "station_id": station_id}
-        return station_info
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_subscribe(self))
+        self.async_on_remove(self._async_cancel_advance)
+        self.async_on_remove(async_get_entity_index(self.hass).async_add(self))
+        # A pause switch added before this sensor picks up its state now
+        async_dispatcher_send(self.hass, SIGNAL_PAUSE_CHANGED.format(self.unique_id), self._paused)
+        if self.coordinator.data:
+            self._process_journeys(self.coordinator.trip_results(self.trip_query))
+
+    @property
+    def trip_query(self):
+        """Return the shared coordinator query for this sensor, once its stops are resolved."""
+        origin_id = self.coordinator.station_id(self._origin)
+        dest_id = self.coordinator.station_id(self._destination)
+        if origin_id is None or dest_id is None:
+            return None
+        return TripQuery(origin_id, dest_id, int(self._delay.total_seconds() // 60))
+
+    @property
+    def lines(self):
+        """Return the lines the sensor shows, or None for every line."""
+        return self._lines
+
+    @property
+    def tracked_reference(self) -> str | None:
+        """Return the details reference of the journey currently shown."""
+        if not self._queue:
+            return None
+        return self._queue[0].reference
+
+    @property
+    def paused(self):
+        return self._paused
 
     @property
     def name(self):
@@ -286,7 +554,7 @@ class VasttrafikJourneySensor(SensorEntity):
         """Return the state attributes."""
         attrs = self._attributes.copy() if self._attributes else {}
         attrs["paused"] = self._paused
-        return attrs
+        return _with_staleness(self.coordinator, self.trip_query, attrs)
 
     @property
     def native_value(self):
@@ -296,105 +564,149 @@ class VasttrafikJourneySensor(SensorEntity):
     def set_paused(self, paused: bool):
         self._paused = paused
         # When pausing, do not trigger a new update, just write state
+        if not paused and self.hass is not None:
+            # Catch up from the cached results, which re-arms the queue timer, and refresh
+            # the query in case it was dropped while this sensor was its only subscriber
+            self._process_journeys(self.coordinator.trip_results(self.trip_query))
+            self.hass.async_create_task(self.coordinator.async_request_refresh())
         self.async_write_ha_state()
+        async_dispatcher_send(self.hass, SIGNAL_PAUSE_CHANGED.format(self.unique_id), paused)
 
     def toggle_paused(self):
-        self._paused = not self._paused
-        self.async_write_ha_state()
+        self.set_paused(not self._paused)
 
-    @Throttle(MIN_TIME_BETWEEN_UPDATES)
-    def update(self) -> None:
-        """Get the next journey."""
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Pick the next journey out of the shared coordinator results."""
         if self._paused:
             _LOGGER.debug(f"Update paused for {self._name} due to internal pause attribute.")
             # Do not update state or attributes if paused
             return
-        try:
-            self._journeys = self._planner.trip(
-                origin_id=self._origin["station_id"],
-                dest_id=self._destination["station_id"],
-                date=now() + self._delay,
+        self._process_journeys(self.coordinator.trip_results(self.trip_query))
+        self.async_write_ha_state()
+
+    def _matching_journeys(self, journeys):
+        """Yield the journeys on the configured lines that can still be reached after the delay."""
+        current = (now() + self._delay).timestamp()
+        for journey in journeys or []:
+            if self._lines and journey.main_leg.line not in self._lines:
+                continue
+            if journey.cancelled:
+                continue
+            departure = journey.departure
+            if departure is not None and departure < current:
+                # Results may be reused from an earlier cycle
+                continue
+            yield journey
+
+    def desired_interval(self, journeys) -> timedelta:
+        """Return how soon the coordinator should refresh this sensor's query.
+
+        The next departure sets the realtime cadence; the queue must also be
+        refilled before its last journey departs.
+        """
+        coordinator = self.coordinator
+        queue = list(islice(self._matching_journeys(journeys), LOOKAHEAD_JOURNEYS))
+        if not queue:
+            return coordinator.max_poll_interval
+        current = now()
+        # Time left to catch the departure, not until it leaves
+        reachable = (current + self._delay).timestamp()
+        main_leg = queue[0].main_leg
+        head_departure = main_leg.departure
+        until_departure = timedelta(seconds=head_departure - reachable) if head_departure else None
+        deviation = main_leg.deviates or (
+            self._last_deviation is not None and current - self._last_deviation < DEVIATION_MEMORY
+        )
+        interval = adaptive_poll_interval(
+            until_departure, deviation, coordinator.min_poll_interval, coordinator.max_poll_interval
+        )
+        last_departure = queue[-1].departure
+        if last_departure is not None:
+            interval = min(
+                interval,
+                max(coordinator.min_poll_interval, timedelta(seconds=last_departure - reachable)),
             )
-        except Error:
-            _LOGGER.debug("Unable to read journeys, updating token")
-            self._planner.update_token()
+        return interval
+
+    def _process_journeys(self, journeys) -> None:
+        """Queue the next journeys and show the first one."""
+        self._journeys = journeys
+        self._queue = list(islice(self._matching_journeys(journeys), LOOKAHEAD_JOURNEYS))
+        self._show_queue_head()
+
+    @callback
+    def _async_cancel_advance(self) -> None:
+        if self._unsub_advance is not None:
+            self._unsub_advance()
+            self._unsub_advance = None
+
+    @callback
+    def _async_advance_queue(self, _now) -> None:
+        """Move on to the next queued journey once the current one can no longer be reached."""
+        self._unsub_advance = None
+        if self._paused:
+            return
+        self._show_queue_head()
+        self.async_write_ha_state()
 
-        if not self._journeys:
+    def _show_queue_head(self) -> None:
+        delay = self._delay.total_seconds()
+        current = now().timestamp() + delay
+        while self._queue and (self._queue[0].departure or current) < current:
+            self._queue.pop(0)
+        self._async_cancel_advance()
+        if self._queue and self.hass is not None:
+            departure = self._queue[0].departure
+            if departure is not None:
+                self._unsub_advance = async_track_point_in_time(
+                    self.hass, self._async_advance_queue, utc_from_timestamp(departure - delay + 1)
+                )
+        self._render_journey(self._queue[0] if self._queue else None)
+        if self._queue:
+            self._attributes["next"] = self._state
+            self._attributes["following"] = [
+                {"departure": format_clock(journey.main_leg.planned_departure), "line": journey.main_leg.line}
+                for journey in self._queue[1:]
+            ]
+
+    def _render_journey(self, journey: Journey | None) -> None:
+        """Set state and attributes from a journey."""
+        if journey is None:
             _LOGGER.debug(
                 "No journeys from %s to %s",
-                self._origin["station_name"],
-                self._destination["station_name"],
+                self._origin,
+                self._destination,
             )
             self._state = None
             self._attributes = {}
-        else:
-            def extract_stop_name(endpoint):
-                if isinstance(endpoint, dict):
-                    if "name" in endpoint:
-                        return endpoint["name"]
-                    if "stopPoint" in endpoint and "name" in endpoint["stopPoint"]:
-                        return endpoint["stopPoint"]["name"]
-                return str(endpoint) if endpoint else "?"
-
-            for journey in self._journeys:
-                legs = journey.get("tripLegs", [])
-                if not legs:
-                    continue
-                main_leg = next((l for l in legs if l.get("serviceJourney")), legs[0])
-                service_journey = main_leg.get("serviceJourney", {})
-                line = service_journey.get("line", {})
-                if not self._lines or line.get("shortName") in self._lines:
-                    dep_time = main_leg.get("plannedDepartureTime")
-                    arr_time = main_leg.get("plannedArrivalTime")
-                    try:
-                        self._state = datetime.fromisoformat(dep_time).strftime("%H:%M")
-                    except Exception:
-                        self._state = dep_time
-
-                    connections = []
-                    for idx, leg in enumerate(legs, 1):
-                        sj = leg.get("serviceJourney", {})
-                        line = sj.get("line", {})
-                        line_name = line.get("shortName") or line.get("name") or "?"
-                        from_endpoint = leg.get("origin") or leg.get("from") or {}
-                        to_endpoint = leg.get("destination") or leg.get("to") or {}
-                        from_name = extract_stop_name(from_endpoint)
-                        to_name = extract_stop_name(to_endpoint)
-                        if from_name == "?" or to_name == "?":
-                            _LOGGER.debug(f"Leg missing stop name: {leg}")
-                        dep = leg.get("plannedDepartureTime")
-                        arr = leg.get("plannedArrivalTime")
-                        dep_fmt = dep[11:16] if dep and len(dep) >= 16 else dep
-                        arr_fmt = arr[11:16] if arr and len(arr) >= 16 else arr
-                        connections.append(f"{idx}. {line_name} from {from_name} to {to_name} ({dep_fmt} → {arr_fmt})")
-                    connections_str = "\n".join(connections)
-
-                    final_arrival = legs[-1].get("plannedArrivalTime") if legs else None
-                    try:
-                        final_arrival_fmt = datetime.fromisoformat(final_arrival).strftime("%H:%M") if final_arrival else None
-                    except Exception:
-                        final_arrival_fmt = final_arrival
-
-                    params = {
-                        ATTR_LINE: line.get("shortName"),
-                        ATTR_FROM: self._origin["station_name"],
-                        ATTR_TO: self._destination["station_name"],
-                        "planned_arrival": arr_time,
-                        "direction": service_journey.get("direction"),
-                        "connections": connections_str,
-                        "final_arrival": final_arrival_fmt,
-                    }
-                    self._attributes = {k: v for k, v in params.items() if v}
-                    break
-
-
-class VasttrafikJourneyListSensor(SensorEntity):
+            return
+
+        main_leg = journey.main_leg
+        if main_leg.deviates:
+            self._last_deviation = now()
+        self._state = format_clock(main_leg.planned_departure)
+        params = {
+            ATTR_LINE: main_leg.line,
+            ATTR_FROM: self._origin,
+            ATTR_TO: self._destination,
+            "planned_arrival": format_iso(main_leg.planned_arrival),
+            "direction": main_leg.direction,
+            "connections": journey.connections(),
+            "final_arrival": format_clock(journey.final_arrival),
+        }
+        self._attributes = {k: v for k, v in params.items() if v}
+
+
+class VasttrafikJourneyListSensor(CoordinatorEntity, SensorEntity):
     """Sensor that lists all journeys for a route in a time window."""
     _attr_icon = "mdi:bus-clock"
     _attr_attribution = "Data provided by Västtrafik"
+    # A full day of journeys would otherwise be stored with every state change
+    _unrecorded_attributes = frozenset({"journeys"})
 
-    def __init__(self, planner, name, origin, destination, lines, start_time, end_time, time_relates_to, index=None):
-        self._planner = planner
+    def __init__(self, coordinator, name, origin, destination, lines, start_time, end_time, time_relates_to, index=None):
+        super().__init__(coordinator)
         self._name = name or f"Journeys {origin} to {destination}"
         self._origin = origin
         self._destination = destination
@@ -403,6 +715,7 @@ class VasttrafikJourneyListSensor(SensorEntity):
         self._end_time = end_time
         self._time_relates_to = time_relates_to
         self._state = None
+        self._journeys: list[Journey] = []
         self._attributes = {}
         self._attr_unique_id = f"journeylist_{origin}_{destination}_{start_time}_{end_time}_{time_relates_to}_{index}"
 
@@ -412,47 +725,296 @@ class VasttrafikJourneyListSensor(SensorEntity):
 
     @property
     def extra_state_attributes(self):
-        return self._attributes
+        return _with_staleness(self.coordinator, self.window_query, dict(self._attributes))
 
     @property
     def native_value(self):
         return self._state
 
-    @Throttle(MIN_TIME_BETWEEN_UPDATES)
-    def update(self):
+    @property
+    def window_query(self):
+        """Return the shared coordinator query for this sensor, once its stops are resolved."""
+        origin_id = self.coordinator.station_id(self._origin)
+        dest_id = self.coordinator.station_id(self._destination)
+        if origin_id is None or dest_id is None:
+            return None
+        return WindowQuery(
+            origin_id,
+            dest_id,
+            self._start_time,
+            self._end_time,
+            self._time_relates_to,
+        )
+
+    @property
+    def lines(self):
+        """Return the lines the sensor shows, or None for every line."""
+        return self._lines
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_subscribe(self))
+        self.async_on_remove(async_get_entity_index(self.hass).async_add(self))
+        if self.coordinator.data:
+            self._process_journeys(self.coordinator.window_results(self.window_query))
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._process_journeys(self.coordinator.window_results(self.window_query))
+        self.async_write_ha_state()
+
+    async def async_get_journeys(self):
+        """Return every journey of the window (get_journeys service)."""
+        return {"journeys": [journey.as_dict() for journey in self._journeys]}
+
+    def _process_journeys(self, results) -> None:
         # Get all journeys for the day in the specified window
-        now_dt = now().replace(second=0, microsecond=0)
-        today = now_dt.date()
-        start_dt = datetime.combine(today, datetime.strptime(self._start_time, "%H:%M").time())
-        end_dt = datetime.combine(today, datetime.strptime(self._end_time, "%H:%M").time())
-        journeys = []
-        dt = start_dt
-        while dt <= end_dt:
-            try:
-                results = self._planner.trip(
-                    origin_id=self._origin,
-                    dest_id=self._destination,
-                    date=dt,
-                    dateTimeRelatesTo=self._time_relates_to,
-                )
-                for journey in results:
-                    main_leg = next((l for l in journey.get("tripLegs", []) if l.get("serviceJourney")), None)
-                    if not main_leg:
-                        continue
-                    line = main_leg.get("serviceJourney", {}).get("line", {})
-                    if self._lines and line.get("shortName") not in self._lines:
-                        continue
-                    dep_time = main_leg.get("plannedDepartureTime")
-                    arr_time = main_leg.get("plannedArrivalTime")
-                    journeys.append({
-                        "departure": dep_time,
-                        "arrival": arr_time,
-                        "line": line.get("shortName"),
-                        "direction": main_leg.get("serviceJourney", {}).get("direction"),
-                    })
-            except Exception as ex:
-                _LOGGER.warning(f"Failed to fetch journey at {dt}: {ex}")
-            # Increment by 5 minutes (or as needed)
-            dt += timedelta(minutes=5)
-        self._attributes = {"journeys": journeys}
-        self._state = len(journeys)
\ No newline at end of file
+        journeys = [
+            journey
+            for journey in results or []
+            if journey.main_leg.line is not None and (not self._lines or journey.main_leg.line in self._lines)
+        ]
+        self._journeys = journeys
+        self._attributes = {
+            "journeys": [journey.as_dict() for journey in journeys[:MAX_JOURNEYS_ATTRIBUTE]],
+        }
+        if len(journeys) > MAX_JOURNEYS_ATTRIBUTE:
+            self._attributes["journeys_truncated"] = True
+        self._state = len(journeys)
+
+
+class VasttrafikDepartureBoardSensor(CoordinatorEntity, SensorEntity):
+    """Departure board of one stop, fetched once per cycle for all of its destination sensors."""
+
+    _attr_icon = "mdi:bus-stop"
+    _attr_attribution = "Data provided by Västtrafik"
+    _unrecorded_attributes = frozenset({"departures"})
+
+    def __init__(self, coordinator, name, origin, index=None):
+        super().__init__(coordinator)
+        self._name = name or f"Departures {origin}"
+        self._origin = origin
+        self._departures: list[Departure] = []
+        self._attr_unique_id = board_unique_id(origin, index)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def origin(self):
+        return self._origin
+
+    @property
+    def native_value(self):
+        """Return the next departure time of any line."""
+        return format_clock(self._departures[0].planned) if self._departures else None
+
+    @property
+    def extra_state_attributes(self):
+        return _with_staleness(self.coordinator, self.board_query, {
+            ATTR_FROM: self._origin,
+            "departures": [departure.as_dict() for departure in self._departures[:MAX_JOURNEYS_ATTRIBUTE]],
+        })
+
+    @property
+    def board_query(self):
+        """Return the shared coordinator query for this board, once its stop is resolved."""
+        stop_id = self.coordinator.station_id(self._origin)
+        if stop_id is None:
+            return None
+        return BoardQuery(stop_id)
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_subscribe(self))
+        self.async_on_remove(async_get_entity_index(self.hass).async_add(self))
+        if self.coordinator.data:
+            self._process_departures(self.coordinator.board_results(self.board_query))
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._process_departures(self.coordinator.board_results(self.board_query))
+        self.async_write_ha_state()
+
+    def upcoming(self, departures) -> list[Departure]:
+        """Return the departures that have not left yet and are not cancelled."""
+        current = now().timestamp()
+        return [
+            departure
+            for departure in departures or []
+            if not departure.cancelled and (departure.departure or current) >= current
+        ]
+
+    def desired_interval(self, departures) -> timedelta:
+        """Refresh before the board runs out of departures; destinations ask for realtime cadence."""
+        coordinator = self.coordinator
+        upcoming = self.upcoming(departures)
+        if not upcoming or upcoming[-1].departure is None:
+            return coordinator.max_poll_interval
+        remaining = timedelta(seconds=upcoming[-1].departure - now().timestamp())
+        return max(coordinator.min_poll_interval, min(coordinator.max_poll_interval, remaining))
+
+    def _process_departures(self, departures) -> None:
+        self._departures = self.upcoming(departures)
+
+
+class VasttrafikBoardDestinationSensor(CoordinatorEntity, SensorEntity):
+    """Next departures of a departure board toward one destination.
+
+    Departures are picked out of the board's shared results by line and by
+    a heading matched against their direction, so any number of
+    destinations cost no more API calls than the board itself.
+    """
+
+    _attr_icon = "mdi:bus-marker"
+    _attr_attribution = "Data provided by Västtrafik"
+
+    def __init__(self, coordinator, board: VasttrafikDepartureBoardSensor, label, heading, lines):
+        super().__init__(coordinator)
+        self._board = board
+        self._name = f"{board.name} {label}"
+        self._heading = heading.casefold() if heading else None
+        self._lines = lines if lines else None
+        self._queue: list[Departure] = []
+        self._last_deviation = None
+        self._unsub_advance = None
+        self._attr_unique_id = f"{board.unique_id}_{label}"
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def board_query(self):
+        return self._board.board_query
+
+    @property
+    def native_value(self):
+        return format_clock(self._queue[0].planned) if self._queue else None
+
+    @property
+    def extra_state_attributes(self):
+        if not self._queue:
+            return _with_staleness(self.coordinator, self.board_query, {ATTR_FROM: self._board.origin})
+        departure = self._queue[0]
+        params = {
+            ATTR_FROM: self._board.origin,
+            ATTR_LINE: departure.line,
+            ATTR_DIRECTION: departure.direction,
+            ATTR_TRACK: departure.track,
+            "estimated_departure": format_iso(departure.estimated),
+            "following": [
+                {"departure": format_clock(following.planned), "line": following.line}
+                for following in self._queue[1:]
+            ],
+        }
+        return _with_staleness(
+            self.coordinator, self.board_query, {k: v for k, v in params.items() if v or k == ATTR_FROM}
+        )
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_subscribe(self))
+        self.async_on_remove(self._async_cancel_advance)
+        self.async_on_remove(async_get_entity_index(self.hass).async_add(self))
+        if self.coordinator.data:
+            self._process_departures(self.coordinator.board_results(self.board_query))
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._process_departures(self.coordinator.board_results(self.board_query))
+        self.async_write_ha_state()
+
+    def _matching_departures(self, departures) -> list[Departure]:
+        """Return the next departures on the configured lines toward the heading."""
+        matching = []
+        for departure in self._board.upcoming(departures):
+            if self._lines and departure.line not in self._lines:
+                continue
+            if self._heading and self._heading not in (departure.direction or "").casefold():
+                continue
+            matching.append(departure)
+            if len(matching) >= LOOKAHEAD_JOURNEYS:
+                break
+        return matching
+
+    def desired_interval(self, departures) -> timedelta:
+        """Poll at the realtime cadence of the next matching departure."""
+        coordinator = self.coordinator
+        queue = self._matching_departures(departures)
+        if not queue or queue[0].departure is None:
+            return coordinator.max_poll_interval
+        current = now()
+        deviation = queue[0].deviates or (
+            self._last_deviation is not None and current - self._last_deviation < DEVIATION_MEMORY
+        )
+        return adaptive_poll_interval(
+            timedelta(seconds=queue[0].departure - current.timestamp()),
+            deviation,
+            coordinator.min_poll_interval,
+            coordinator.max_poll_interval,
+        )
+
+    def _process_departures(self, departures) -> None:
+        self._queue = self._matching_departures(departures)
+        self._show_queue_head()
+
+    @callback
+    def _async_cancel_advance(self) -> None:
+        if self._unsub_advance is not None:
+            self._unsub_advance()
+            self._unsub_advance = None
+
+    @callback
+    def _async_advance_queue(self, _now) -> None:
+        """Move on to the next queued departure once the current one has left."""
+        self._unsub_advance = None
+        self._show_queue_head()
+        self.async_write_ha_state()
+
+    def _show_queue_head(self) -> None:
+        current = now().timestamp()
+        while self._queue and (self._queue[0].departure or current) < current:
+            self._queue.pop(0)
+        self._async_cancel_advance()
+        if not self._queue:
+            return
+        head = self._queue[0]
+        if head.deviates:
+            self._last_deviation = now()
+        if head.departure is not None and self.hass is not None:
+            self._unsub_advance = async_track_point_in_time(
+                self.hass, self._async_advance_queue, utc_from_timestamp(head.departure + 1)
+            )
+
+
+class VasttrafikDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """API usage of a config entry, updated after every coordinator refresh."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:chart-box-outline"
+
+    def __init__(self, coordinator, entry_id, description: DiagnosticSensorDescription):
+        super().__init__(coordinator)
+        self._description = description
+        self._attr_name = f"Västtrafik {description.name}"
+        self._attr_unique_id = f"{entry_id}_{description.key}"
+        self._attr_native_unit_of_measurement = description.unit
+        self._attr_device_class = description.device_class
+        self._attr_state_class = description.state_class
+
+    @property
+    def available(self) -> bool:
+        # Failed refreshes are what these sensors are meant to show
+        return True
+
+    @property
+    def native_value(self):
+        return self._description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self):
+        if self._description.attributes_fn is None:
+            return None
+        return self._description.attributes_fn(self.coordinator)
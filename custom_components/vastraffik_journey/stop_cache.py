@@ -0,0 +1,199 @@
+"""Persistent stop name to GID cache for Vastraffik Journey."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import VasttrafikApiClient, VasttrafikApiError
+from .const import DOMAIN
+from .stop_index import StopIndex, fold_stop_name
+from .util import domain_singleton
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.stops"
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+# Entries older than this are still served, but revalidated in the background
+STOP_TTL = 7 * 24 * 3600
+SEARCH_TTL = 24 * 3600
+# A name the locations API found no stop for is not looked up again for this long
+UNKNOWN_STOP_TTL = 3600
+SEARCH_LIMIT = 10
+
+DATA_STOP_CACHE = "stop_cache"
+
+
+class StopNotFoundError(LookupError):
+    """The locations API knows no stop by that name."""
+
+
+def normalize_stop_name(name: str) -> str:
+    """Return the cache key for a stop name."""
+    return " ".join(name.casefold().split())
+
+
+async def async_get_stop_cache(hass: HomeAssistant) -> StopCache:
+    """Return the stop cache shared by all entries, loading it on first use."""
+    cache = domain_singleton(hass, DATA_STOP_CACHE, lambda: StopCache(hass))
+    await cache.async_load()
+    return cache
+
+
+class StopCache:
+    """Stop name resolutions and autocomplete results kept in HA storage.
+
+    Both maps are keyed by the normalized query. Cached values are always
+    answered immediately; once older than their TTL they are refreshed in
+    the background so restarts and reloads need no location calls.
+
+    Every stop seen in a response also goes into a local ``StopIndex``, which
+    answers autocomplete searches without a call whenever it is known to hold
+    all matches.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._stops: dict[str, dict] = {}
+        self._searches: dict[str, dict] = {}
+        # Names without any match, and when they were looked up; not persisted
+        self._unknown: dict[str, float] = {}
+        self.index = StopIndex()
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+        self._revalidating: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+    async def async_load(self) -> None:
+        async with self._load_lock:
+            if self._loaded:
+                return
+            data = await self._store.async_load() or {}
+            self._stops = data.get("stops", {})
+            self._searches = data.get("searches", {})
+            self.index.extend((stop["gid"], stop["name"]) for stop in self._stops.values())
+            self.index.extend(
+                (loc["gid"], loc["name"])
+                for search in self._searches.values()
+                for loc in search["results"]
+            )
+            self._loaded = True
+
+    @callback
+    def _data_to_save(self) -> dict:
+        return {"stops": self._stops, "searches": self._searches}
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _async_remember(self, name: str, gid: str) -> None:
+        self._stops[normalize_stop_name(name)] = {"name": name, "gid": gid, "updated": time.time()}
+        self.index.add(gid, name)
+
+    async def async_resolve(self, client: VasttrafikApiClient, name: str) -> str:
+        """Return the stop area GID for a stop name.
+
+        Raises StopNotFoundError if no stop matches the name.
+        """
+        key = normalize_stop_name(name)
+        entry = self._stops.get(key)
+        if entry is None:
+            looked_up = self._unknown.get(key)
+            if looked_up is not None and time.time() - looked_up < UNKNOWN_STOP_TTL:
+                self.hits += 1
+                raise StopNotFoundError(name)
+            self.misses += 1
+            return await self._async_fetch_stop(client, name)
+        self.hits += 1
+        if time.time() - entry["updated"] > STOP_TTL:
+            self._async_revalidate(f"stop:{key}", self._async_fetch_stop(client, name))
+        return entry["gid"]
+
+    async def async_search(self, client: VasttrafikApiClient, partial: str) -> list[dict]:
+        """Return location suggestions for a partial stop name."""
+        key = normalize_stop_name(partial)
+        entry = self._searches.get(key)
+        if entry is not None:
+            self.hits += 1
+            if time.time() - entry["updated"] > SEARCH_TTL:
+                self._async_revalidate(f"search:{key}", self._async_fetch_search(client, partial))
+            return entry["results"]
+        local = self.index.search(partial, SEARCH_LIMIT)
+        if len(local) >= SEARCH_LIMIT or self._is_covered(partial):
+            self.hits += 1
+            return local
+        self.misses += 1
+        return await self._async_fetch_search(client, partial)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "stops": len(self._stops),
+            "searches": len(self._searches),
+            "unknown": len(self._unknown),
+            "indexed": len(self.index),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+    def _is_covered(self, partial: str) -> bool:
+        """Return True if an earlier, shorter search already returned every match."""
+        folded = fold_stop_name(partial)
+        return any(
+            len(search["results"]) < SEARCH_LIMIT and folded.startswith(fold_stop_name(key))
+            for key, search in self._searches.items()
+        )
+
+    async def _async_fetch_stop(self, client: VasttrafikApiClient, name: str) -> str:
+        locations = await client.async_location_name(name)
+        if not locations:
+            key = normalize_stop_name(name)
+            if key not in self._unknown:
+                _LOGGER.warning("No stop matches %s, looking it up again in %d minutes", name, UNKNOWN_STOP_TTL // 60)
+            self._unknown[key] = time.time()
+            raise StopNotFoundError(name)
+        self._unknown.pop(normalize_stop_name(name), None)
+        gid = locations[0]["gid"]
+        self._async_remember(name, gid)
+        self._async_schedule_save()
+        return gid
+
+    async def _async_fetch_search(self, client: VasttrafikApiClient, partial: str) -> list[dict]:
+        results = [
+            {"gid": loc["gid"], "name": loc["name"]}
+            for loc in await client.async_location_name(partial, limit=SEARCH_LIMIT)
+            if loc.get("gid") and loc.get("name")
+        ]
+        self._searches[normalize_stop_name(partial)] = {"results": results, "updated": time.time()}
+        # Whatever the user picks from these suggestions resolves without a call later
+        for loc in results:
+            self._async_remember(loc["name"], loc["gid"])
+        self._async_schedule_save()
+        return results
+
+    @callback
+    def _async_revalidate(self, key: str, coro) -> None:
+        if key in self._revalidating:
+            coro.close()
+            return
+        self._revalidating.add(key)
+
+        async def _revalidate():
+            try:
+                await coro
+            except (VasttrafikApiError, StopNotFoundError) as ex:
+                _LOGGER.debug("Revalidating cached stop %s failed: %s", key, ex)
+            finally:
+                self._revalidating.discard(key)
+
+        self.hass.async_create_background_task(_revalidate(), f"{DOMAIN} revalidate {key}")
@@ -0,0 +1,75 @@
+"""In-memory prefix index of stop areas for config flow autocomplete."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+import unicodedata
+
+
+def fold_stop_name(text: str) -> str:
+    """Return a lookup key with case and diacritics folded away (Göteborg -> goteborg)."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+
+class StopIndex:
+    """Sorted array of folded stop names supporting word prefix search.
+
+    Every word of a stop name starts its own key, so "gote" finds
+    "Centralstationen, Göteborg" as well as "Göteborgsvägen".
+    """
+
+    def __init__(self):
+        self._keys: list[tuple[str, str]] = []
+        self._names: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, gid: str, name: str) -> None:
+        """Add or rename a stop area."""
+        if self._names.get(gid) == name:
+            return
+        if gid in self._names:
+            self._keys = [key for key in self._keys if key[1] != gid]
+        self._names[gid] = name
+        for key in self._word_keys(name):
+            insort(self._keys, (key, gid))
+
+    def extend(self, stops) -> None:
+        """Bulk load (gid, name) pairs, sorting once."""
+        for gid, name in stops:
+            if gid in self._names:
+                continue
+            self._names[gid] = name
+            self._keys.extend((key, gid) for key in self._word_keys(name))
+        self._keys.sort()
+
+    def search(self, partial: str, limit: int = 10) -> list[dict[str, str]]:
+        """Return up to ``limit`` stops with a word starting with ``partial``."""
+        prefix = fold_stop_name(partial)
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        pos = bisect_left(self._keys, (prefix, ""))
+        while pos < len(self._keys) and len(results) < limit:
+            key, gid = self._keys[pos]
+            if not key.startswith(prefix):
+                break
+            if gid not in seen:
+                seen.add(gid)
+                results.append({"gid": gid, "name": self._names[gid]})
+            pos += 1
+        return results
+
+    @staticmethod
+    def _word_keys(name: str) -> set[str]:
+        folded = fold_stop_name(name.replace(",", " "))
+        keys = set()
+        start = 0
+        while True:
+            keys.add(folded[start:])
+            start = folded.find(" ", start) + 1
+            if not start:
+                return keys
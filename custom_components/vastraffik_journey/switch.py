@@ -1,8 +1,9 @@
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.helpers.entity_component import async_update_entity
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import EntityCategory
-from homeassistant.helpers import entity_registry as er
 import logging
+from .entity_index import SIGNAL_PAUSE_CHANGED, async_get_entity_index
 from .sensor import build_sensor_unique_id, CONF_DEPARTURES
 
 _LOGGER = logging.getLogger(__name__)
@@ -19,50 +20,49 @@ async def async_setup_entry(hass, entry, async_add_entities):
     for idx, dep in enumerate(departures):
         unique_id = build_sensor_unique_id(dep, idx)
         _LOGGER.debug(f"Creating switch for journey idx={idx}, unique_id={unique_id}, dep={dep}")
-        switches.append(VasttrafikPauseSwitch(unique_id, dep.get("name"), hass))
-    async_add_entities(switches, True)
+        switches.append(VasttrafikPauseSwitch(unique_id, dep.get("name")))
+    async_add_entities(switches)
 
 class VasttrafikPauseSwitch(SwitchEntity):
-    def __init__(self, sensor_unique_id, name, hass):
+    # The linked sensor pushes its pause state through a dispatcher signal
+    _attr_should_poll = False
+
+    def __init__(self, sensor_unique_id, name):
         self._sensor_unique_id = sensor_unique_id
         self._attr_unique_id = f"pause_{sensor_unique_id}"
         self._attr_name = f"Pause {name or sensor_unique_id}"
         self._attr_icon = "mdi:pause-circle"
         self._attr_entity_category = EntityCategory.CONFIG
-        self._hass = hass
+        self._attr_is_on = False
 
-    @property
-    def is_on(self):
-        sensor_entity_id = self._find_sensor_entity_id()
-        if sensor_entity_id:
-            state = self._hass.states.get(sensor_entity_id)
-            if state and "paused" in state.attributes:
-                return state.attributes["paused"]
-        return False
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        sensor = async_get_entity_index(self.hass).get(self._sensor_unique_id)
+        if sensor is not None:
+            self._attr_is_on = sensor.paused
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_PAUSE_CHANGED.format(self._sensor_unique_id), self._async_pause_changed
+            )
+        )
+
+    @callback
+    def _async_pause_changed(self, paused):
+        self._attr_is_on = paused
+        self.async_write_ha_state()
 
     async def async_turn_on(self, **kwargs):
-        await self._call_pause_service(True)
+        self._set_sensor_paused(True)
 
     async def async_turn_off(self, **kwargs):
-        await self._call_pause_service(False)
-
-    def _find_sensor_entity_id(self):
-        ent_reg = er.async_get(self._hass)
-        for entity in ent_reg.entities.values():
-            if entity.unique_id == self._sensor_unique_id:
-                return entity.entity_id
-        return None
+        self._set_sensor_paused(False)
 
-    async def _call_pause_service(self, paused):
-        sensor_entity_id = self._find_sensor_entity_id()
-        if sensor_entity_id:
-            await self._hass.services.async_call(
-                "vastraffik_journey",
-                "set_pause",
-                {"entity_id": sensor_entity_id, "paused": paused},
-                blocking=True,
-            )
-            await async_update_entity(self._hass, sensor_entity_id)
+    def _set_sensor_paused(self, paused):
+        sensor = async_get_entity_index(self.hass).get(self._sensor_unique_id)
+        if sensor is None:
+            _LOGGER.warning("Journey sensor %s is not loaded", self._sensor_unique_id)
+            return
+        sensor.set_paused(paused)
 
     @property
     def entity_category(self):
@@ -0,0 +1,80 @@
+"""Bounded LRU cache of trip search responses shared by all sensors."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .util import domain_singleton
+
+DATA_TRIP_CACHE = "trip_cache"
+
+DEFAULT_MAX_SIZE = 512
+# Kept below the coordinator interval so every cycle still sees fresh realtime data
+DEFAULT_TTL = 90
+DEFAULT_BUCKET = 60
+
+
+@callback
+def async_get_trip_cache(hass: HomeAssistant) -> TripCache:
+    """Return the trip cache coordinators answer repeated searches from."""
+    return domain_singleton(hass, DATA_TRIP_CACHE, TripCache)
+
+
+class TripCache:
+    """Trip responses keyed by route and a bucket of the requested time.
+
+    Two searches for the same route whose times fall in the same bucket are
+    answered by one response. Entries are dropped when older than ``ttl``
+    seconds or when the cache grows past ``max_size`` (least recently used
+    first).
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, ttl: float = DEFAULT_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(origin_id: str, dest_id: str, when: datetime, time_relates_to: str | None, bucket: int = DEFAULT_BUCKET) -> tuple:
+        """Build the cache key of a search, ``bucket`` being in seconds."""
+        return (origin_id, dest_id, time_relates_to or "departure", bucket, int(when.timestamp()) // bucket)
+
+    def get(self, key: tuple) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored, value = entry
+        if time.monotonic() - stored > self.ttl:
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: tuple, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
@@ -0,0 +1,23 @@
+"""Helpers shared by the modules of Vastraffik Journey."""
+
+from __future__ import annotations
+
+from typing import Callable, TypeVar
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+_T = TypeVar("_T")
+
+
+def domain_singleton(hass: HomeAssistant, key: str, factory: Callable[[], _T]) -> _T:
+    """Return the object kept under ``key`` in the integration's ``hass.data``.
+
+    It is created with ``factory`` on first use and then shared by all
+    config entries and YAML platforms.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if key not in domain_data:
+        domain_data[key] = factory()
+    return domain_data[key]
@@ -0,0 +1,68 @@
+"""Shared fixtures for the Vastraffik Journey tests."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+import zipfile
+
+import pytest
+
+# A daily service from Origin to Destination on lines 6 and 11
+FEED = {
+    "stops.txt": "stop_id,stop_name\nA,Origin\nB,Destination\n",
+    "routes.txt": "route_id,route_short_name\nr6,6\nr11,11\n",
+    "calendar.txt": (
+        "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,start_date,end_date\n"
+        "daily,1,1,1,1,1,1,1,20260101,20261231\n"
+    ),
+    "trips.txt": (
+        "route_id,service_id,trip_id,trip_headsign\n"
+        "r6,daily,t0700,Destination\n"
+        "r11,daily,t0702,Destination\n"
+        "r6,daily,t0730,Destination\n"
+        "r11,daily,t0800,Destination\n"
+        "r11,daily,t2350,Destination\n"
+    ),
+    "stop_times.txt": (
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "t0700,07:00:00,07:00:00,A,1\nt0700,07:25:00,07:25:00,B,2\n"
+        "t0702,07:02:00,07:02:00,A,1\nt0702,07:20:00,07:20:00,B,2\n"
+        "t0730,07:30:00,07:30:00,A,1\nt0730,07:55:00,07:55:00,B,2\n"
+        "t0800,08:00:00,08:00:00,A,1\nt0800,08:20:00,08:20:00,B,2\n"
+        "t2350,23:50:00,23:50:00,A,1\nt2350,24:10:00,24:10:00,B,2\n"
+    ),
+}
+
+
+@pytest.fixture
+def feed_path(tmp_path):
+    """Write FEED as a GTFS zip and return its path."""
+    path = tmp_path / "feed.zip"
+    with zipfile.ZipFile(path, "w") as feed:
+        for name, content in FEED.items():
+            feed.writestr(name, content)
+    return path
+
+
+class FakeClock:
+    """Stand-in for the time module whose monotonic clock only moves when told to."""
+
+    def __init__(self):
+        self.current = 1000.0
+
+    def monotonic(self) -> float:
+        return self.current
+
+    def advance(self, seconds: float) -> None:
+        self.current += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def no_jitter():
+    """Stand-in for the random module that always picks the top of the range."""
+    return SimpleNamespace(uniform=lambda low, high: high)
@@ -0,0 +1,94 @@
+"""Tests for the per-endpoint circuit breakers."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.vastraffik_journey import circuit_breaker
+from custom_components.vastraffik_journey.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitBreakers,
+)
+
+
+@pytest.fixture(autouse=True)
+def _patch_time(monkeypatch, clock, no_jitter):
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    monkeypatch.setattr(circuit_breaker, "random", no_jitter)
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.threshold):
+        breaker.record_failure()
+
+
+def test_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=3, base=30)
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.state == STATE_CLOSED and breaker.allow()
+    assert breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() == 30
+
+
+def test_success_resets_the_count():
+    breaker = CircuitBreaker(threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker(threshold=1, base=30)
+    _open(breaker)
+    clock.advance(30)
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    # A cancelled trial hands the slot to the next request
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.retry_in() == 0
+
+
+def test_failed_trial_doubles_the_backoff(clock):
+    breaker = CircuitBreaker(threshold=1, base=30, maximum=100)
+    _open(breaker)
+    clock.advance(30)
+    assert breaker.allow()
+    assert breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.retry_in() == 60
+    clock.advance(60)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.retry_in() == 100
+
+
+def test_requests_in_flight_do_not_reopen(clock):
+    breaker = CircuitBreaker(threshold=2, base=30)
+    _open(breaker)
+    clock.advance(10)
+    # Sent before the circuit opened, failing afterwards
+    assert not breaker.record_failure()
+    assert breaker.retry_in() == 20
+    assert breaker.opened == 1
+
+
+def test_breakers_per_endpoint():
+    breakers = CircuitBreakers()
+    assert breakers.retry_in("journeys") == 0
+    _open(breakers.get("journeys"))
+    assert breakers.get("journeys") is breakers.get("journeys")
+    assert breakers.retry_in("journeys") > 0
+    assert breakers.retry_in("departures") == 0
+    assert breakers.as_dict()["journeys"]["state"] == STATE_OPEN
@@ -0,0 +1,40 @@
+"""Tests for the entity index."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from custom_components.vastraffik_journey.entity_index import EntityIndex
+
+
+def _entity(unique_id, entity_id):
+    return SimpleNamespace(unique_id=unique_id, entity_id=entity_id)
+
+
+def test_add_and_remove():
+    index = EntityIndex()
+    sensor = _entity("journey_1", "sensor.journey_1")
+    remove = index.async_add(sensor)
+    assert index.get("journey_1") is sensor
+    assert index.get_by_entity_id("sensor.journey_1") is sensor
+    remove()
+    assert index.get("journey_1") is None
+    assert index.get_by_entity_id("sensor.journey_1") is None
+
+
+def test_entity_without_unique_id():
+    index = EntityIndex()
+    sensor = _entity(None, "sensor.yaml_journey")
+    index.async_add(sensor)()
+    assert index.get_by_entity_id("sensor.yaml_journey") is None
+
+
+def test_removing_a_replaced_entity_keeps_the_new_one():
+    index = EntityIndex()
+    old = _entity("journey_1", "sensor.journey_1")
+    remove_old = index.async_add(old)
+    new = _entity("journey_1", "sensor.journey_1")
+    index.async_add(new)
+    remove_old()
+    assert index.get("journey_1") is new
+    assert index.get_by_entity_id("sensor.journey_1") is new
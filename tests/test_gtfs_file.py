@@ -0,0 +1,87 @@
+"""Tests for compiled GTFS timetables."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+import os
+
+from custom_components.vastraffik_journey.gtfs import MAX_SCAN, GtfsTimetable
+from custom_components.vastraffik_journey.gtfs_file import (
+    COMPILED_SUFFIX,
+    _is_current,
+    compile_timetable,
+    is_compiled,
+    load_timetable,
+    open_timetable,
+)
+from custom_components.vastraffik_journey.router import JourneyRouter
+
+DAY = datetime(2026, 3, 2, tzinfo=timezone.utc)
+
+
+def _summary(journeys):
+    return [
+        [
+            (leg.line, leg.direction, leg.origin, leg.destination, leg.planned_departure, leg.planned_arrival)
+            for leg in journey.legs
+        ]
+        for journey in journeys
+    ]
+
+
+def test_compiled_timetable_routes_like_the_feed(feed_path, tmp_path):
+    timetable = GtfsTimetable.from_zip(feed_path)
+    compiled = tmp_path / "feed.timetable"
+    compile_timetable(timetable, compiled)
+    assert is_compiled(compiled)
+    assert not is_compiled(feed_path)
+
+    from_zip = JourneyRouter(timetable)
+    mapped = JourneyRouter(open_timetable(compiled))
+    for after in (DAY + timedelta(hours=6), DAY + timedelta(hours=7, minutes=1), DAY + timedelta(hours=23, minutes=55)):
+        for lines in (None, {"6"}, {"11"}):
+            assert _summary(mapped.journeys("A", "B", after, lines=lines, limit=MAX_SCAN)) == _summary(
+                from_zip.journeys("A", "B", after, lines=lines, limit=MAX_SCAN)
+            )
+    start, end = DAY + timedelta(hours=7), DAY + timedelta(hours=9)
+    for time_relates_to in ("departure", "arrival"):
+        assert _summary(mapped.journeys_between("A", "B", start, end, time_relates_to)) == _summary(
+            from_zip.journeys_between("A", "B", start, end, time_relates_to)
+        )
+
+
+def test_load_timetable_compiles_next_to_the_zip(feed_path):
+    compiled = feed_path.with_name(feed_path.name + COMPILED_SUFFIX)
+    load_timetable(str(feed_path))
+    assert _is_current(compiled, feed_path)
+    written = compiled.stat().st_mtime_ns
+
+    load_timetable(str(feed_path))
+    assert compiled.stat().st_mtime_ns == written
+    # The compiled file can also be given directly
+    assert load_timetable(str(compiled)).area("A") is not None
+
+
+def test_newer_zip_is_recompiled(feed_path):
+    compiled = feed_path.with_name(feed_path.name + COMPILED_SUFFIX)
+    load_timetable(str(feed_path))
+    # As if the zip had been replaced after compiling
+    earlier = feed_path.stat().st_mtime - 60
+    os.utime(compiled, (earlier, earlier))
+    assert not _is_current(compiled, feed_path)
+
+    load_timetable(str(feed_path))
+    assert _is_current(compiled, feed_path)
+    assert compiled.stat().st_mtime > earlier
+
+
+def test_calendar_outside_the_feed_range(feed_path, tmp_path):
+    timetable = GtfsTimetable.from_zip(feed_path)
+    compiled = tmp_path / "feed.timetable"
+    compile_timetable(timetable, compiled)
+    calendar = open_timetable(compiled).calendar
+
+    for day in (date(2026, 1, 1), date(2026, 7, 15), date(2026, 12, 31)):
+        assert calendar.active(day) == timetable.calendar.active(day) == bytearray([1])
+    for day in (date(2025, 12, 31), date(2027, 1, 1), date(1999, 1, 1)):
+        assert calendar.active(day) == bytearray([0])
@@ -0,0 +1,83 @@
+"""Tests for the priority rate limiter."""
+
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.vastraffik_journey.rate_limiter import (
+    PRIORITY_BULK,
+    PRIORITY_LOOKUP,
+    PRIORITY_REALTIME,
+    RateLimiter,
+)
+
+
+def test_burst_is_served_without_waiting():
+    async def run():
+        limiter = RateLimiter(rate=1, burst=3)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(3):
+            await limiter.acquire()
+        return loop.time() - start, limiter.queued
+
+    elapsed, queued = asyncio.run(run())
+    assert elapsed < 0.05
+    assert queued == 0
+
+
+def test_waiters_are_served_by_priority_then_arrival():
+    async def run():
+        limiter = RateLimiter(rate=50, burst=1)
+        await limiter.acquire()
+        order = []
+
+        async def request(name, priority):
+            await limiter.acquire(priority)
+            order.append(name)
+
+        tasks = []
+        for name, priority in (
+            ("lookup", PRIORITY_LOOKUP),
+            ("bulk 1", PRIORITY_BULK),
+            ("bulk 2", PRIORITY_BULK),
+            ("realtime", PRIORITY_REALTIME),
+        ):
+            tasks.append(asyncio.create_task(request(name, priority)))
+            # Let each request queue up before the next one arrives
+            await asyncio.sleep(0)
+        assert limiter.queued == 4
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ["realtime", "bulk 1", "bulk 2", "lookup"]
+
+
+def test_penalize_blocks_until_retry_after():
+    async def run():
+        limiter = RateLimiter(rate=1000, burst=5)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        limiter.penalize(0.2)
+        await limiter.acquire()
+        return loop.time() - start
+
+    elapsed = asyncio.run(run())
+    # Blocked for retry_after, then one token has to refill
+    assert 0.2 <= elapsed < 0.5
+
+
+def test_cancelled_waiter_does_not_take_a_token():
+    async def run():
+        limiter = RateLimiter(rate=20, burst=1)
+        await limiter.acquire()
+        cancelled = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await limiter.acquire()
+        return loop.time() - start
+
+    # The next request gets the first refilled token, about 1 / rate later
+    assert asyncio.run(run()) < 0.1
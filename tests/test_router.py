@@ -0,0 +1,51 @@
+"""Tests for the GTFS journey router."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.vastraffik_journey.gtfs import MAX_SCAN, GtfsTimetable
+from custom_components.vastraffik_journey.router import JourneyRouter
+
+DAY = datetime(2026, 3, 2, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def router(feed_path):
+    return JourneyRouter(GtfsTimetable.from_zip(feed_path))
+
+
+def _at(hour: int, minute: int, days: int = 0) -> int:
+    return int((DAY + timedelta(days=days, hours=hour, minutes=minute)).timestamp())
+
+
+def test_journeys_stop_at_horizon(router):
+    journeys = router.journeys("A", "B", DAY + timedelta(hours=6), limit=MAX_SCAN)
+    # 07:00 is left out, 07:02 arrives earlier; the next day is beyond the horizon
+    assert [j.departure for j in journeys] == [_at(7, 2), _at(7, 30), _at(8, 0), _at(23, 50)]
+
+
+def test_journeys_roll_over_to_next_day(router):
+    journeys = router.journeys("A", "B", DAY + timedelta(hours=23, minutes=55), limit=2)
+    assert [j.departure for j in journeys] == [_at(7, 2, days=1), _at(7, 30, days=1)]
+
+
+def test_journeys_on_lines(router):
+    journeys = router.journeys("A", "B", DAY + timedelta(hours=6), lines={"6"}, limit=2)
+    assert [j.departure for j in journeys] == [_at(7, 0), _at(7, 30)]
+
+
+def test_arrival_window(router):
+    journeys = router.journeys_between(
+        "A", "B", DAY + timedelta(hours=7, minutes=10), DAY + timedelta(hours=8), "arrival"
+    )
+    assert [j.final_arrival for j in journeys] == [_at(7, 20), _at(7, 55)]
+
+
+def test_arrival_window_on_lines(router):
+    journeys = router.journeys_between(
+        "A", "B", DAY + timedelta(hours=7), DAY + timedelta(hours=8), "arrival", lines={"6"}
+    )
+    assert [j.final_arrival for j in journeys] == [_at(7, 25), _at(7, 55)]
@@ -0,0 +1,47 @@
+"""Tests for the shared trip cache."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+
+from custom_components.vastraffik_journey import trip_cache
+from custom_components.vastraffik_journey.trip_cache import TripCache
+
+
+@pytest.fixture(autouse=True)
+def _patch_time(monkeypatch, clock):
+    monkeypatch.setattr(trip_cache, "time", clock)
+
+
+def test_key_buckets_the_requested_time():
+    first = TripCache.key("A", "B", datetime(2026, 3, 2, 7, 0, 5, tzinfo=timezone.utc), None, 60)
+    same = TripCache.key("A", "B", datetime(2026, 3, 2, 7, 0, 55, tzinfo=timezone.utc), "departure", 60)
+    later = TripCache.key("A", "B", datetime(2026, 3, 2, 7, 1, 0, tzinfo=timezone.utc), None, 60)
+    arrival = TripCache.key("A", "B", datetime(2026, 3, 2, 7, 0, 5, tzinfo=timezone.utc), "arrival", 60)
+    assert first == same
+    assert first != later
+    assert first != arrival
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TripCache(ttl=90)
+    cache.put("key", "page")
+    clock.advance(90)
+    assert cache.get("key") == "page"
+    clock.advance(1)
+    assert cache.get("key") is None
+    assert cache.stats() == {"size": 0, "hits": 1, "misses": 1, "evictions": 1, "hit_rate": 0.5}
+
+
+def test_least_recently_used_is_evicted():
+    cache = TripCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1